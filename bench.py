@@ -0,0 +1,312 @@
+"""Benchmarki generowania, fizyki i rysowania - uruchamiane bez okna.
+
+Wyniki to płaski słownik metryk {nazwa: {"value", "unit", "higher_is_better"}}
+zapisywany jako JSON. Z --baseline porównujemy z zapisanym wcześniej plikiem
+i zgłaszamy metryki, które pogorszyły się o więcej niż próg. Metryki check.*
+to liczby naruszeń - każda niezerowa kończy przebieg błędem.
+
+    python bench.py --out bench.json
+    python bench.py --baseline bench.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from level import LevelGenerator, generate_level
+from levelpack import LevelPack, write_pack
+from main import Game, ScriptedPolicy, World
+from settings import *
+
+BENCH_SEED = 1234
+
+
+def _metric(value, unit, higher_is_better=False):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def _add_enemies(world, count, seed):
+    """Dokłada `count` wrogów nad pierwszymi ekranami poziomu (stała liczba aktywnych)."""
+    if not count:
+        return
+    rng = random.Random(seed)
+    left = world.player.rect.x
+    xs = [left + rng.randrange(-SCREEN_WIDTH // 2, SCREEN_WIDTH) for _ in range(count)]
+    ys = [rng.randrange(0, 4) * TILE_SIZE for _ in range(count)]
+    world.enemies.add(xs, ys)
+
+
+# --- Generowanie ---
+def bench_generation(screens_list, difficulties, repeats):
+    results = {}
+    for difficulty in difficulties:
+        for screens in screens_list:
+            generator = LevelGenerator(level_length_screens=screens)
+            times = []
+            for i in range(repeats):
+                start = time.perf_counter()
+                level = generator.generate(difficulty, seed=BENCH_SEED + i)
+                times.append(time.perf_counter() - start)
+
+            # Pamięć osobnym przebiegiem - tracemalloc spowalnia generowanie
+            tracemalloc.start()
+            level = generator.generate(difficulty, seed=BENCH_SEED)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            name = f"generation.screens={screens}.difficulty={difficulty}"
+            results[f"{name}.ms"] = _metric(statistics.median(times) * 1000, "ms")
+            results[f"{name}.peak_kb"] = _metric(peak / 1024, "KiB")
+            results[f"{name}.level_kb"] = _metric(len(level.to_bytes()) / 1024, "KiB")
+    return results
+
+
+# --- Paczki poziomów ---
+def bench_pack(count, loads):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pack")
+        write_pack(path, (generate_level(BENCH_SEED + i, 2) for i in range(count)))
+        rng = random.Random(BENCH_SEED)
+        start = time.perf_counter()
+        pack = LevelPack(path)
+        opened = time.perf_counter() - start
+        times = []
+        for _ in range(loads):
+            index = rng.randrange(count)
+            start = time.perf_counter()
+            pack[index]
+            times.append(time.perf_counter() - start)
+        pack.close()
+
+    name = f"pack.levels={count}"
+    results[f"{name}.open_ms"] = _metric(opened * 1000, "ms")
+    results[f"{name}.load_ms"] = _metric(statistics.median(times) * 1000, "ms")
+    return results
+
+
+# --- Fizyka ---
+def bench_physics(enemy_counts, ticks):
+    results = {}
+    for count in enemy_counts:
+        random.seed(BENCH_SEED)
+        world = World(level_length_screens=8)
+        policy = ScriptedPolicy()
+        world.load_level(seed=BENCH_SEED)
+        _add_enemies(world, count, BENCH_SEED)
+
+        elapsed = 0.0
+        for _ in range(ticks):
+            controls = policy(world)
+            start = time.perf_counter()
+            world.update(controls)
+            elapsed += time.perf_counter() - start
+            if world.game_over:
+                world.load_level(seed=BENCH_SEED)
+                _add_enemies(world, count, BENCH_SEED)
+
+        name = f"physics.enemies={count}"
+        results[f"{name}.ticks_per_second"] = _metric(ticks / elapsed, "ticks/s", True)
+    return results
+
+
+# --- Rysowanie ---
+def bench_draw(enemy_counts, frames, dirty=False, render_width=None):
+    results = {}
+    game = Game(dirty=dirty, render_width=render_width)
+    try:
+        for count in enemy_counts:
+            random.seed(BENCH_SEED)
+            policy = ScriptedPolicy()
+            game.load_level()
+            _add_enemies(game.world, count, BENCH_SEED)
+
+            times = []
+            for _ in range(frames):
+                game.world.update(policy(game.world))
+                if game.world.game_over:
+                    game.load_level()
+                    _add_enemies(game.world, count, BENCH_SEED)
+                start = time.perf_counter()
+                game.draw()
+                times.append(time.perf_counter() - start)
+
+            times.sort()
+            name = "draw"
+            if dirty:
+                name += ".dirty"
+            if render_width:
+                name += f".width={render_width}"
+            name += f".enemies={count}"
+            results[f"{name}.mean_ms"] = _metric(statistics.fmean(times) * 1000, "ms")
+            results[f"{name}.p95_ms"] = _metric(
+                times[int(len(times) * 0.95)] * 1000, "ms"
+            )
+    finally:
+        if game.prefetcher:
+            game.prefetcher.shutdown()
+        pygame.quit()
+    return results
+
+
+# --- Kontrole rysowania ---
+def check_dirty_scroll(frames=600):
+    """Przewinięte klatki --dirty mają być łatane, nie rysowane w całości.
+
+    Kamera rusza dopiero, gdy gracz minie środek ekranu - stąd stała, długa
+    próba także w trybie --quick.
+    """
+    random.seed(BENCH_SEED)
+    game = Game(dirty=True)
+    try:
+        policy = ScriptedPolicy()
+        game.load_level()
+        game.draw()
+        scrolled = full = 0
+        for _ in range(frames):
+            game.world.update(policy(game.world))
+            if game.world.game_over:
+                game.restart_level()
+                game.draw()
+                continue
+            camera_x = game.drawn_camera_x
+            before = game.full_redraws
+            game.draw()
+            if game.drawn_camera_x != camera_x:
+                scrolled += 1
+                full += game.full_redraws - before
+    finally:
+        if game.prefetcher:
+            game.prefetcher.shutdown()
+        pygame.quit()
+    # Bez przewijania kontrola nic by nie sprawdziła - to też naruszenie
+    return {
+        "check.dirty.scrolled_full_redraws": _metric(
+            full if scrolled else frames, "frames"
+        )
+    }
+
+
+def check_hud_renders(frames):
+    """HUD bez zmian nie woła font.render - liczniki idą z atlasu glifów."""
+    random.seed(BENCH_SEED)
+    game = Game()
+    try:
+        game.load_level()
+        game.draw_ui()
+        before = game.hud.cache.misses
+        for _ in range(frames):
+            game.draw_ui()
+        renders = game.hud.cache.misses - before
+    finally:
+        if game.prefetcher:
+            game.prefetcher.shutdown()
+        pygame.quit()
+    return {"check.hud.unchanged_font_renders": _metric(renders, "renders")}
+
+
+def run_benchmarks(quick=False):
+    if quick:
+        generation = bench_generation([4, 8], [1, 2], repeats=5)
+        generation.update(bench_pack(200, loads=100))
+        physics = bench_physics([0, 100, 1000], ticks=1000)
+        draw = bench_draw([0, 1000], frames=120)
+        dirty = bench_draw([0, 1000], frames=120, dirty=True)
+        scaled = bench_draw([0, 1000], frames=120, render_width=960)
+        checks = check_dirty_scroll()
+        checks.update(check_hud_renders(120))
+    else:
+        generation = bench_generation([4, 8, 16, 32], [1, 2], repeats=20)
+        generation.update(bench_pack(2000, loads=1000))
+        physics = bench_physics([0, 100, 1000, 5000], ticks=5000)
+        draw = bench_draw([0, 100, 1000], frames=600)
+        dirty = bench_draw([0, 100, 1000], frames=600, dirty=True)
+        scaled = bench_draw([0, 1000], frames=600, render_width=960)
+        scaled.update(bench_draw([0, 1000], frames=600, render_width=640))
+        checks = check_dirty_scroll()
+        checks.update(check_hud_renders(600))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "quick": quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "metrics": {**generation, **physics, **draw, **dirty, **scaled, **checks},
+    }
+
+
+def compare(current, baseline, threshold=0.10):
+    """Lista (nazwa, przed, po, zmiana) metryk gorszych o więcej niż `threshold`.
+
+    Zmiana to względne pogorszenie: dodatnia wartość zawsze znaczy "gorzej".
+    """
+    regressions = []
+    for name, metric in current["metrics"].items():
+        before = baseline["metrics"].get(name)
+        if before is None or not before["value"]:
+            continue
+        change = (metric["value"] - before["value"]) / before["value"]
+        if metric["higher_is_better"]:
+            change = -change
+        if change > threshold:
+            regressions.append((name, before["value"], metric["value"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki Super Pygame Bros")
+    parser.add_argument("--out", help="zapisz wyniki do pliku JSON")
+    parser.add_argument("--baseline", help="porównaj z wcześniejszym plikiem JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="dopuszczalne pogorszenie względem bazy (0.10 = 10%%)",
+    )
+    parser.add_argument("--quick", action="store_true", help="krótsze przebiegi")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(quick=args.quick)
+    for name, metric in results["metrics"].items():
+        print(f"{name:48} {metric['value']:12.3f} {metric['unit']}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [
+        name
+        for name, metric in results["metrics"].items()
+        if name.startswith("check.") and metric["value"]
+    ]
+    for name in failed:
+        print(f"CHECK FAILED {name}: {results['metrics'][name]['value']}")
+    if failed:
+        return 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before:.3f} -> {after:.3f} ({change:+.0%})")
+        if regressions:
+            return 1
+        print(f"no regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Wrogowie jako struktura tablic NumPy - bez zależności od pygame.
+
+Zamiast sprite'a z własnym update() na każdego wroga, pozycje, prędkości i
+flagi życia trzymane są w tablicach i krokowane jednym przebiegiem dla
+wszystkich naraz. Zachowanie odpowiada dawnemu Enemy.update: grawitacja,
+patrol w poziomie, zawracanie na ścianie i lądowanie na podłożu.
+
+Z grafem nawigacji poziomu (navigation.NavGraph) wrogowie są sprytniejsi:
+zawracają przed przepaścią, a w pobliżu gracza idą do niego po trasie z
+grafu, skacząc na cegły i rury.
+"""
+
+import numpy as np
+
+from navigation import LINK_JUMP
+from physics import ENEMY_FALL_LIMIT, enemy_step, solid_grid
+from settings import *
+
+# Uśpieni wrogowie leżą w kubełkach tej szerokości; budzenie sprawdza tylko
+# kubełki pod oknem kamery, więc koszt nie zależy od długości poziomu
+BUCKET_WIDTH = 4 * TILE_SIZE
+
+
+class EnemySwarm:
+    """Wrogowie poziomu; symulowani są tylko aktywni (w pobliżu kamery).
+
+    Nowi wrogowie zaczynają uśpieni. activate() budzi tych, którzy weszli w
+    margines wokół kadru, i usypia tych, którzy zostali daleko za nim - ich
+    stan jest zamrożony, a update() i kolizje w ogóle ich nie dotykają.
+    """
+
+    def __init__(
+        self,
+        wake_margin=ENEMY_WAKE_MARGIN,
+        sleep_distance=ENEMY_SLEEP_DISTANCE,
+        navigation=None,
+    ):
+        self.x = np.zeros(0, dtype=np.int64)
+        self.y = np.zeros(0, dtype=np.int64)
+        self.vel_x = np.zeros(0, dtype=np.int64)
+        self.vel_y = np.zeros(0, dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+
+        self.wake_margin = wake_margin
+        self.sleep_distance = sleep_distance
+        self.active = np.zeros(0, dtype=np.int64)  # Indeksy obudzonych wrogów
+        self._buckets = {}  # kubełek x -> lista indeksów uśpionych wrogów
+        self._evicted_bucket = None  # Kubełki poniżej tego numeru już usunięto
+
+        self._level = None
+        self._level_shape = None
+        self._solid = None
+
+        self.navigation = navigation  # NavGraph poziomu albo None (prosty patrol)
+        self._target_surface = -1  # Ostatnia powierzchnia, na której stał gracz
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def add(self, xs, ys):
+        """Dodaje uśpionych wrogów w pozycjach (piksele); startują w lewo."""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        self._compact()
+        first = len(self.x)
+        self.x = np.concatenate([self.x, xs])
+        self.y = np.concatenate([self.y, ys])
+        self.vel_x = np.concatenate([self.vel_x, np.full(len(xs), -ENEMY_SPEED)])
+        self.vel_y = np.concatenate([self.vel_y, np.zeros(len(xs))])
+        self.alive = np.concatenate([self.alive, np.ones(len(xs), dtype=bool)])
+        self._sleep(np.arange(first, len(self.x)))
+
+    def snapshot(self):
+        """Kopia stanu wrogów (tablice, aktywni, kubełki) dla restore()."""
+        return (
+            self.x.copy(),
+            self.y.copy(),
+            self.vel_x.copy(),
+            self.vel_y.copy(),
+            self.alive.copy(),
+            self.active.copy(),
+            {bucket: list(indices) for bucket, indices in self._buckets.items()},
+            self._evicted_bucket,
+            self._target_surface,
+        )
+
+    def restore(self, snapshot):
+        """Przywraca stan z snapshot(); migawka zostaje nietknięta."""
+        x, y, vel_x, vel_y, alive, active, buckets, evicted, target = snapshot
+        self.x = x.copy()
+        self.y = y.copy()
+        self.vel_x = vel_x.copy()
+        self.vel_y = vel_y.copy()
+        self.alive = alive.copy()
+        self.active = active.copy()
+        self._buckets = {bucket: list(indices) for bucket, indices in buckets.items()}
+        self._evicted_bucket = evicted
+        self._target_surface = target
+
+    def add_spawns(self, spawns):
+        spawns = list(spawns)
+        self.add(
+            [spawn.col * TILE_SIZE for spawn in spawns],
+            [spawn.row * TILE_SIZE for spawn in spawns],
+        )
+
+    def _compact(self):
+        # Martwi wrogowie zostają w tablicach (zamaskowani) do następnego dodawania
+        if self.alive.all():
+            return
+        keep = self.alive
+        new_index = np.cumsum(keep) - 1
+        self.x = self.x[keep]
+        self.y = self.y[keep]
+        self.vel_x = self.vel_x[keep]
+        self.vel_y = self.vel_y[keep]
+        self.alive = self.alive[keep]
+
+        # Indeksy aktywnych i uśpionych przesuwają się razem z tablicami
+        active = self.active[keep[self.active]]
+        self.active = new_index[active]
+        for bucket, indices in self._buckets.items():
+            self._buckets[bucket] = [int(new_index[i]) for i in indices if keep[i]]
+
+    # --- Aktywacja ---
+    def _sleep(self, indices):
+        for index, x in zip(indices.tolist(), self.x[indices].tolist()):
+            self._buckets.setdefault(x // BUCKET_WIDTH, []).append(index)
+
+    def activate(self, view_left, view_right):
+        """Budzi wrogów w pobliżu kadru [view_left, view_right) i usypia odległych."""
+        woken = []
+        first = (view_left - self.wake_margin) // BUCKET_WIDTH
+        last = (view_right + self.wake_margin) // BUCKET_WIDTH
+        for bucket in range(first, last + 1):
+            indices = self._buckets.pop(bucket, None)
+            if indices:
+                woken.extend(indices)
+
+        active = self.active[self.alive[self.active]]
+        behind = self.x[active] + ENEMY_SIZE < view_left - self.sleep_distance
+        if behind.any():
+            self._sleep(active[behind])
+            active = active[~behind]
+
+        if woken:
+            active = np.concatenate([active, np.array(woken, dtype=np.int64)])
+            active.sort()  # Kolejność jak przy dodawaniu - kolizje w tej samej kolejności
+        self.active = active
+
+    # --- Siatka poziomu ---
+    def _solid_grid(self, level):
+        # Kopia siatki (physics.solid_grid) odświeżana tylko, gdy poziom się zmienił
+        shape = (level.origin, level.width)
+        if level is not self._level or shape != self._level_shape:
+            self._solid = solid_grid(level)
+            self._level = level
+            self._level_shape = shape
+        return self._solid
+
+    # --- Nawigacja ---
+    def _steer(self, x, y, vel_x, vel_y, target):
+        """Decyzje wrogów stojących na ziemi według grafu; zwraca (x, vel_x, vel_y)."""
+        nav = self.navigation
+        if not len(nav):
+            return x, vel_x, vel_y
+        grounded = (vel_y == 0) & (y % TILE_SIZE == 0)
+        surface = nav.surface_at((x + ENEMY_SIZE // 2) // TILE_SIZE, y // TILE_SIZE)
+        on = grounded & (surface >= 0)
+        known = np.where(on, surface, 0)
+
+        # Patrol: zawracanie przed krawędzią, za którą jest przepaść
+        turn = on & (
+            ((vel_x > 0) & (x + vel_x > nav.right_x[known]) & ~nav.right_safe[known])
+            | ((vel_x < 0) & (x + vel_x < nav.left_x[known]) & ~nav.left_safe[known])
+        )
+        vel_x = np.where(turn, -vel_x, vel_x)
+        if target is None:
+            return x, vel_x, vel_y
+
+        # Pościg: pierwszy krok trasy do powierzchni gracza (z pamięci grafu)
+        target_left, target_top, target_w, target_h = target
+        found = nav.surface_under(target_left, target_top + target_h, target_w)
+        if found is not None:
+            self._target_surface = found
+        goal = self._target_surface
+        if goal < 0:
+            return x, vel_x, vel_y
+        target_x = target_left + target_w // 2
+        chasing = on & (np.abs(x + ENEMY_SIZE // 2 - target_x) < ENEMY_CHASE_DISTANCE)
+        for i in np.flatnonzero(chasing).tolist():
+            src = int(surface[i])
+            if src == goal:
+                offset = target_x - (int(x[i]) + ENEMY_SIZE // 2)
+                if abs(offset) > ENEMY_SPEED:
+                    vel_x[i] = ENEMY_SPEED if offset > 0 else -ENEMY_SPEED
+                continue
+            link = nav.route(src, goal)
+            if link is None:
+                continue
+            kind, direction, takeoff_x, _ = link
+            offset = takeoff_x - int(x[i])
+            if abs(offset) > ENEMY_SPEED:
+                vel_x[i] = ENEMY_SPEED if offset > 0 else -ENEMY_SPEED
+                continue
+            x[i] = takeoff_x
+            vel_x[i] = direction * ENEMY_SPEED
+            if kind == LINK_JUMP:
+                vel_y[i] = ENEMY_JUMP_POWER
+        return x, vel_x, vel_y
+
+    # --- Symulacja ---
+    def update(self, level, target=None):
+        """Krok aktywnych wrogów; `target` to prostokąt gracza (x, y, w, h) do pościgu."""
+        active = self.active[self.alive[self.active]]
+        if len(active) == 0:
+            return
+        x = self.x[active]
+        y = self.y[active]
+        vel_x = self.vel_x[active]
+        vel_y = self.vel_y[active]
+        if self.navigation is not None:
+            x, vel_x, vel_y = self._steer(x, y, vel_x, vel_y, target)
+        x, y, vel_x, vel_y, _, _, _ = enemy_step(
+            self._solid_grid(level), level.origin, x, y, vel_x, vel_y
+        )
+
+        self.x[active] = x
+        self.y[active] = y
+        self.vel_x[active] = vel_x
+        self.vel_y[active] = vel_y
+        self.alive[active] = y <= ENEMY_FALL_LIMIT
+
+    # --- Zapytania dla gracza i rysowania ---
+    def overlapping(self, x, y, w, h):
+        """Indeksy aktywnych wrogów nachodzących na prostokąt (jak colliderect)."""
+        active = self.active
+        ex = self.x[active]
+        ey = self.y[active]
+        hits = (
+            self.alive[active]
+            & (ex < x + w)
+            & (ex + ENEMY_SIZE > x)
+            & (ey < y + h)
+            & (ey + ENEMY_SIZE > y)
+        )
+        return active[hits]
+
+    def visible(self, left, right):
+        """Indeksy aktywnych wrogów w pasie [left, right) świata (w pikselach).
+
+        Przy nieujemnym marginesie budzenia każdy wróg w kadrze jest aktywny.
+        """
+        active = self.active
+        ex = self.x[active]
+        return active[self.alive[active] & (ex + ENEMY_SIZE > left) & (ex < right)]
+
+    def centery(self, index):
+        return int(self.y[index]) + ENEMY_SIZE // 2
+
+    def die(self, index):
+        self.alive[index] = False
+
+    def kill_left_of(self, x):
+        """Usuwa wrogów (aktywnych i uśpionych) całkowicie na lewo od x."""
+        active = self.active
+        self.alive[active] &= self.x[active] + ENEMY_SIZE >= x
+
+        # Kubełki za granicą usuwamy raz - kursor tylko rośnie
+        last = x // BUCKET_WIDTH
+        bucket = self._evicted_bucket
+        if bucket is None:
+            bucket = min(self._buckets, default=last)
+        for bucket in range(bucket, last):
+            for index in self._buckets.pop(bucket, ()):
+                self.alive[index] = False
+        self._evicted_bucket = max(bucket, last)
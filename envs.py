@@ -0,0 +1,367 @@
+"""Środowiska dla agentów: reset(seed) / step(actions) na wielu światach naraz.
+
+VecEnv trzyma N niezależnych światów (World bez okna) rozdzielonych między
+procesy robocze. Akcje, obserwacje, nagrody i flagi końca leżą w tablicach
+NumPy we wspólnej pamięci - krok to tylko zapis akcji i dwa spotkania na
+barierze, bez przesyłania (i pikle'owania) czegokolwiek między procesami.
+
+Obserwacja to wycinek siatki poziomu wokół gracza, OBS_ROWS x OBS_COLS
+kodów OBS_*; gracz stoi zawsze w kolumnie OBS_BEHIND i środkowym wierszu.
+Akcja to maska wejścia INPUT_* (0-15). Epizod kończy się śmiercią, flagą
+albo po `max_steps` krokach; środowisko resetuje się wtedy samo, a zwrócona
+obserwacja jest już pierwszą obserwacją nowego epizodu.
+
+    python envs.py --envs 64 --workers 8 --steps 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from settings import *
+
+OBS_ROWS = 16
+OBS_COLS = 24
+OBS_BEHIND = 8  # Kolumn widocznych za graczem; reszta okna jest przed nim
+
+OBS_EMPTY = 0
+OBS_SOLID = 1
+OBS_FLAG = 2
+OBS_ENEMY = 3
+
+REWARD_PROGRESS = 1.0 / TILE_SIZE  # Za każdy piksel w prawo
+REWARD_WIN = 50.0
+REWARD_DEATH = -10.0
+
+_OBS_LOOKUP = np.full(256, OBS_SOLID, dtype=np.uint8)
+_OBS_LOOKUP[TYPE_EMPTY] = OBS_EMPTY
+_OBS_LOOKUP[list(FLAG_TYPES)] = OBS_FLAG
+
+_CMD_STEP = 0
+_CMD_RESET = 1
+_CMD_CLOSE = 2
+
+
+def observe(world, out):
+    """Zapisuje do `out` (OBS_ROWS x OBS_COLS, uint8) otoczenie gracza."""
+    level = world.level
+    rect = world.player.rect
+    left = rect.centerx // TILE_SIZE - OBS_BEHIND
+    top = rect.centery // TILE_SIZE - OBS_ROWS // 2
+    out.fill(OBS_EMPTY)
+
+    r0 = max(top, 0)
+    r1 = min(top + OBS_ROWS, level.height)
+    if r0 >= r1:
+        return out
+
+    # Kolumny usunięte przez strumień są dla gracza ścianą (jak w kolizjach)
+    evicted_end = min(level.origin, left + OBS_COLS)
+    if left < evicted_end and _OBS_LOOKUP[level.evicted_type] != OBS_EMPTY:
+        out[r0 - top : r1 - top, max(left, 0) - left : evicted_end - left] = (
+            _OBS_LOOKUP[level.evicted_type]
+        )
+
+    c0 = max(left, level.origin)
+    c1 = min(left + OBS_COLS, level.width)
+    if c0 < c1:
+        # Widok na bajty poziomu żyje tylko do końca przypisania, więc
+        # bytearray poziomu może dalej rosnąć w trybie strumieniowym
+        grid = np.frombuffer(level.tiles, dtype=np.uint8).reshape(-1, level.height)
+        out[r0 - top : r1 - top, c0 - left : c1 - left] = _OBS_LOOKUP[
+            grid[c0 - level.origin : c1 - level.origin, r0:r1]
+        ].T
+        del grid
+
+    enemies = world.enemies
+    active = enemies.active[enemies.alive[enemies.active]]
+    cols = (enemies.x[active] + TILE_SIZE // 2) // TILE_SIZE - left
+    rows = (enemies.y[active] + TILE_SIZE // 2) // TILE_SIZE - top
+    inside = (cols >= 0) & (cols < OBS_COLS) & (rows >= 0) & (rows < OBS_ROWS)
+    out[rows[inside], cols[inside]] = OBS_ENEMY
+    return out
+
+
+class _EnvGroup:
+    """Światy o indeksach [start, stop) piszące do wspólnych buforów."""
+
+    def __init__(
+        self, buffers, start, stop, level_num, level_length_screens, max_steps
+    ):
+        # Import tutaj: main ładuje pygame, a proces roboczy potrzebuje go bez okna
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+
+        from main import World
+
+        pygame.display.init()
+        self.buffers = buffers
+        self.start = start
+        self.stop = stop
+        self.level_num = level_num
+        self.max_steps = max_steps
+        self.worlds = [
+            World(level_length_screens=level_length_screens) for _ in range(start, stop)
+        ]
+        self.rngs = [random.Random() for _ in self.worlds]
+        self.steps = [0] * len(self.worlds)
+        self.last_x = [0] * len(self.worlds)
+
+    def _begin(self, i, seed):
+        world = self.worlds[i]
+        world.current_level_num = self.level_num
+        world.load_level(seed)
+        self.steps[i] = 0
+        self.last_x[i] = world.player.rect.x
+        observe(world, self.buffers["obs"][self.start + i])
+
+    def reset(self):
+        seeds = self.buffers["seeds"]
+        for i in range(len(self.worlds)):
+            seed = int(seeds[self.start + i])
+            self.rngs[i].seed(seed)
+            self._begin(i, seed)
+
+    def step(self):
+        actions = self.buffers["actions"].tolist()
+        rewards = self.buffers["rewards"]
+        dones = self.buffers["dones"]
+        wins = self.buffers["wins"]
+        obs = self.buffers["obs"]
+        for i, world in enumerate(self.worlds):
+            index = self.start + i
+            world.update(actions[index])
+            x = world.player.rect.x
+            reward = (x - self.last_x[i]) * REWARD_PROGRESS
+            self.last_x[i] = x
+            self.steps[i] += 1
+
+            done = world.game_over or self.steps[i] >= self.max_steps
+            if world.game_over:
+                reward += REWARD_WIN if world.win else REWARD_DEATH
+            rewards[index] = reward
+            dones[index] = done
+            wins[index] = world.game_over and world.win
+            if done:
+                self._begin(i, self.rngs[i].getrandbits(32))
+            else:
+                observe(world, obs[index])
+
+
+def _buffer_specs(num_envs):
+    return {
+        "obs": ((num_envs, OBS_ROWS, OBS_COLS), np.uint8),
+        "actions": ((num_envs,), np.uint8),
+        "rewards": ((num_envs,), np.float32),
+        "dones": ((num_envs,), np.bool_),
+        "wins": ((num_envs,), np.bool_),
+        "seeds": ((num_envs,), np.uint32),
+        "command": ((1,), np.int32),
+    }
+
+
+def _attach(names, num_envs):
+    """Tablice NumPy nad istniejącymi blokami wspólnej pamięci."""
+    blocks = {}
+    buffers = {}
+    for key, (shape, dtype) in _buffer_specs(num_envs).items():
+        block = shared_memory.SharedMemory(name=names[key])
+        blocks[key] = block
+        buffers[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, buffers
+
+
+def _worker(names, num_envs, start, stop, barrier, options):
+    blocks = buffers = command = group = None
+    try:
+        blocks, buffers = _attach(names, num_envs)
+        command = buffers["command"]
+        group = _EnvGroup(buffers, start, stop, **options)
+        while True:
+            barrier.wait()
+            if command[0] == _CMD_CLOSE:
+                break
+            if command[0] == _CMD_RESET:
+                group.reset()
+            else:
+                group.step()
+            barrier.wait()
+    except threading.BrokenBarrierError:
+        pass  # Barierę przerwał inny proces - błąd zgłasza proces główny
+    except BaseException:
+        # Bez przerwania bariery proces główny czekałby na nas w nieskończoność
+        barrier.abort()
+        raise
+    finally:
+        del group, buffers, command
+        for block in (blocks or {}).values():
+            block.close()
+
+
+class VecEnv:
+    """N środowisk krokowanych razem; `workers=0` liczy wszystko w tym procesie.
+
+    Zwracane tablice są widokami na wspólną pamięć i są nadpisywane przy
+    następnym reset()/step() - kto chce je zachować, kopiuje. Błąd w procesie
+    roboczym albo brak odpowiedzi przez `timeout` sekund kończy reset()/step()
+    wyjątkiem RuntimeError.
+    """
+
+    def __init__(
+        self,
+        num_envs,
+        workers=None,
+        level_num=1,
+        level_length_screens=8,
+        max_steps=3000,
+        timeout=60.0,
+    ):
+        self.num_envs = num_envs
+        self.timeout = timeout
+        if workers is None:
+            workers = min(num_envs, os.cpu_count() or 1)
+        self.workers = min(workers, num_envs)
+        options = {
+            "level_num": level_num,
+            "level_length_screens": level_length_screens,
+            "max_steps": max_steps,
+        }
+
+        self._blocks = {}
+        self.buffers = {}
+        for key, (shape, dtype) in _buffer_specs(num_envs).items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            block = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks[key] = block
+            self.buffers[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        self.observations = self.buffers["obs"]
+        self.rewards = self.buffers["rewards"]
+        self.dones = self.buffers["dones"]
+        self.wins = self.buffers["wins"]
+
+        self._local = None
+        self._processes = []
+        if self.workers == 0:
+            self._local = _EnvGroup(self.buffers, 0, num_envs, **options)
+            return
+
+        # Równe porcje środowisk na proces; bariera łączy wszystkich z tym procesem
+        self._barrier = multiprocessing.Barrier(self.workers + 1)
+        names = {key: block.name for key, block in self._blocks.items()}
+        bounds = np.linspace(0, num_envs, self.workers + 1).astype(int).tolist()
+        for start, stop in zip(bounds, bounds[1:]):
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(names, num_envs, start, stop, self._barrier, options),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    def _run(self, command):
+        if self._local is not None:
+            if command == _CMD_RESET:
+                self._local.reset()
+            else:
+                self._local.step()
+            return
+        self.buffers["command"][0] = command
+        self._wait()
+        self._wait()
+
+    def _wait(self):
+        try:
+            self._barrier.wait(self.timeout)
+        except threading.BrokenBarrierError:
+            for process in self._processes:
+                process.join(1.0)
+            codes = [process.exitcode for process in self._processes]
+            raise RuntimeError(
+                f"Proces roboczy VecEnv przerwał pracę albo nie odpowiada "
+                f"(kody wyjścia: {codes})"
+            ) from None
+
+    def reset(self, seed=None):
+        """Zaczyna nowe epizody; środowisko i dostaje seed `seed + i`.
+
+        Bez seeda każde środowisko losuje własny. Zwraca obserwacje.
+        """
+        if seed is None:
+            seeds = [random.getrandbits(32) for _ in range(self.num_envs)]
+        else:
+            seeds = [(seed + i) & 0xFFFFFFFF for i in range(self.num_envs)]
+        self.buffers["seeds"][:] = seeds
+        self._run(_CMD_RESET)
+        return self.observations
+
+    def step(self, actions):
+        """Jeden krok wszystkich środowisk: zwraca (obs, rewards, dones, info)."""
+        self.buffers["actions"][:] = actions
+        self._run(_CMD_STEP)
+        return self.observations, self.rewards, self.dones, {"win": self.wins}
+
+    def close(self):
+        if self._processes:
+            # Po przerwanej barierze procesy już kończą pracę albo wiszą - nie czekamy
+            if not self._barrier.broken:
+                self.buffers["command"][0] = _CMD_CLOSE
+                try:
+                    self._barrier.wait(self.timeout)
+                except threading.BrokenBarrierError:
+                    pass
+            for process in self._processes:
+                process.join(self.timeout)
+                if process.is_alive():
+                    process.terminate()
+            self._processes = []
+        self._local = None
+        self.buffers = self.observations = self.rewards = None
+        self.dones = self.wins = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pomiar przepustowości VecEnv")
+    parser.add_argument("--envs", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument(
+        "--level", type=int, default=1, help="numer poziomu (motyw i trudność)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with VecEnv(args.envs, args.workers, level_num=args.level) as env:
+        env.reset(args.seed)
+        episodes = wins = 0
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            # Losowe akcje z przewagą biegu w prawo
+            actions = rng.integers(0, 16, args.envs, dtype=np.uint8)
+            actions[rng.random(args.envs) < 0.7] = INPUT_RIGHT | INPUT_SPRINT
+            _, _, dones, info = env.step(actions)
+            episodes += int(dones.sum())
+            wins += int(info["win"].sum())
+        elapsed = time.perf_counter() - start
+
+    steps = args.envs * args.steps
+    print(
+        f"{steps} steps in {elapsed:.2f}s ({steps / elapsed:.0f} steps/s, "
+        f"{env.workers} workers, episodes={episodes}, wins={wins})"
+    )
@@ -0,0 +1,133 @@
+"""HUD w trybie zachowanym: napisy renderowane raz, w klatce tylko blity.
+
+font.render to najdroższa część HUD-u, a jego napisy prawie się nie zmieniają.
+TextCache trzyma gotowe powierzchnie w LRU według (tekst, font, kolor).
+Liczniki zmieniające się co klatkę (czas, FPS) składamy z atlasu glifów
+wyrenderowanego raz. Hud pamięta każdy element i odświeża go tylko wtedy, gdy
+zmieniła się jego wartość, więc klatka bez zmian kosztuje kilka blitów.
+"""
+
+import collections
+
+import pygame
+
+COUNTER_CHARS = "0123456789.:-"
+
+
+class TextCache:
+    """LRU wyrenderowanych napisów: (tekst, font, kolor) -> Surface."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.misses = 0  # Liczba wywołań font.render (sprawdza bench.py)
+        self._surfaces = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color):
+        key = (text, font, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = font.render(text, True, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.maxsize:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+
+class GlyphAtlas:
+    """Znaki liczników wyrenderowane raz obok siebie na jednej powierzchni.
+
+    Napis to ciąg blitów wycinków atlasu - bez font.render. Cyfry w
+    proporcjonalnych fontach i tak mają zwykle równą szerokość, więc brak
+    kerningu nie rzuca się w oczy.
+    """
+
+    def __init__(self, font, color, chars=COUNTER_CHARS):
+        glyphs = [font.render(char, True, color) for char in chars]
+        self.height = max(glyph.get_height() for glyph in glyphs)
+        self.surface = pygame.Surface(
+            (sum(glyph.get_width() for glyph in glyphs), self.height),
+            pygame.SRCALPHA,
+        )
+        self.areas = {}
+        x = 0
+        for char, glyph in zip(chars, glyphs):
+            self.surface.blit(glyph, (x, 0))
+            self.areas[char] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+
+    def width(self, text):
+        try:
+            return sum(self.areas[char].width for char in text)
+        except KeyError as missing:
+            raise ValueError(f"Znak {missing} spoza atlasu glifów") from None
+
+    def compose(self, text, surface=None):
+        """Składa `text` z glifów; `surface` wystarczającej szerokości jest reużywana."""
+        width = self.width(text)
+        if surface is None or surface.get_width() < width:
+            surface = pygame.Surface((max(width, 1), self.height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        blits = []
+        x = 0
+        for char in text:
+            area = self.areas[char]
+            blits.append((self.surface, (x, 0), area))
+            x += area.width
+        surface.blits(blits, doreturn=False)
+        return surface
+
+
+class Hud:
+    """Elementy HUD-u zachowane między klatkami.
+
+    W każdej klatce wołamy text()/counter() dla elementów do pokazania - to
+    tylko porównanie z poprzednią wartością - a potem draw(). Położenie
+    podajemy jak w Surface.get_rect (topleft=..., center=...).
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else TextCache()
+        self._elements = {}  # nazwa -> [wartość, położenie, Surface, Rect]
+        self._shown = []
+
+    def text(self, name, text, font, color, **place):
+        """Napis z pamięci podręcznej; zwraca jego prostokąt."""
+        value = (text, font, color)
+        element = self._elements.get(name)
+        if element is None or element[0] != value:
+            surface = self.cache.render(font, text, color)
+            element = self._elements[name] = [value, None, surface, None]
+        return self._show(name, element, place)
+
+    def counter(self, name, text, atlas, **place):
+        """Szybko zmienna wartość złożona z atlasu glifów; zwraca jej prostokąt."""
+        value = (text, atlas)
+        element = self._elements.get(name)
+        if element is None:
+            element = self._elements[name] = [None, None, None, None]
+        if element[0] != value:
+            surface = element[2] if element[0] and element[0][1] is atlas else None
+            element[0] = value
+            element[2] = atlas.compose(text, surface)
+            element[1] = None
+        return self._show(name, element, place)
+
+    def _show(self, name, element, place):
+        if element[1] != place:
+            element[1] = place
+            element[3] = element[2].get_rect(**place)
+        self._shown.append(name)
+        return element[3]
+
+    def draw(self, surface):
+        """Blituje elementy pokazane od poprzedniego draw(); zwraca ich prostokąty."""
+        elements = self._elements
+        blits = [(elements[name][2], elements[name][3]) for name in self._shown]
+        self._shown = []
+        return surface.blits(blits)
@@ -0,0 +1,481 @@
+"""Kompaktowy model poziomu i generator - bez zależności od pygame.
+
+Poziom to siatka bajtów z typami kafelków (kolumnami, po `height` wierszy
+na kolumnę) plus krótka lista wrogów. Sprite'y powstają dopiero w grze,
+dla fragmentu, który jest akurat widoczny.
+"""
+
+import argparse
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from settings import *
+
+# Tablica "czy blok jest stały" dla każdej możliwej wartości bajtu
+SOLID = bytes(0 if t == TYPE_EMPTY or t in FLAG_TYPES else 1 for t in range(256))
+
+_HEADER = struct.Struct("<4sHHHBBiiH")
+_MAGIC = b"AIL1"
+
+
+class EnemySpawn:
+    __slots__ = ("col", "row")
+
+    def __init__(self, col, row):
+        self.col = col
+        self.row = row
+
+
+class LevelData:
+    """Siatka typów kafelków w układzie kolumnowym.
+
+    Przechowywane są kolumny [origin, width): kafelek (col, row) leży pod
+    indeksem (col - origin) * height + row. Poziom pełny ma origin == 0;
+    w trybie strumieniowym kolumny za graczem są usuwane i origin rośnie.
+    """
+
+    def __init__(self, height, theme_name="day", difficulty=1):
+        self.height = height
+        self.width = 0
+        self.origin = 0
+        self.tiles = bytearray()
+        self.enemies = []
+        self.spawn = (0, 0)
+        self.theme_name = theme_name
+        self.difficulty = difficulty
+        # Co zwracać dla usuniętych kolumn - w trybie strumieniowym niewidzialna ściana
+        self.evicted_type = TYPE_EMPTY
+
+    def tile_at(self, col, row):
+        if 0 <= row < self.height:
+            if self.origin <= col < self.width:
+                return self.tiles[(col - self.origin) * self.height + row]
+            if 0 <= col < self.origin:
+                return self.evicted_type
+        return TYPE_EMPTY
+
+    def set_tile(self, col, row, tile_type):
+        if col >= self.width:
+            # Poziom rośnie kolumnami w miarę generowania
+            self.tiles.extend(
+                bytes([TYPE_EMPTY]) * ((col + 1 - self.width) * self.height)
+            )
+            self.width = col + 1
+        self.tiles[(col - self.origin) * self.height + row] = tile_type
+
+    def fill_column(self, col, row_start, row_end, tile_type):
+        """Wypełnia wiersze [row_start, row_end) kolumny jednym typem."""
+        if col >= self.width:
+            self.set_tile(col, row_start, tile_type)
+        base = (col - self.origin) * self.height
+        self.tiles[base + row_start : base + row_end] = bytes([tile_type]) * (
+            row_end - row_start
+        )
+
+    def evict_before(self, col):
+        """Usuwa kolumny < col (pamięć stała przy dowolnie długim poziomie)."""
+        col = min(col, self.width)
+        if col <= self.origin:
+            return
+        del self.tiles[: (col - self.origin) * self.height]
+        self.origin = col
+
+    def cells(self, x, y, w, h):
+        """Zwraca niepuste komórki (col, row, typ) pod prostokątem w pikselach."""
+        tiles = self.tiles
+        height = self.height
+        origin = self.origin
+        found = []
+        row_start = max(0, y // TILE_SIZE)
+        row_end = min(height - 1, (y + h - 1) // TILE_SIZE)
+        for col in range(
+            max(0, x // TILE_SIZE), min(self.width - 1, (x + w - 1) // TILE_SIZE) + 1
+        ):
+            if col < origin:
+                if self.evicted_type != TYPE_EMPTY:
+                    for row in range(row_start, row_end + 1):
+                        found.append((col, row, self.evicted_type))
+                continue
+            base = (col - origin) * height
+            for row in range(row_start, row_end + 1):
+                tile_type = tiles[base + row]
+                if tile_type != TYPE_EMPTY:
+                    found.append((col, row, tile_type))
+        return found
+
+    def solid_cells(self, x, y, w, h):
+        """Zwraca komórki (col, row) bloków stałych pod prostokątem.
+
+        Wywoływane kilka razy na ciało w każdej klatce - stąd ręczne granice
+        zamiast min/max i bez pośredniej listy z cells().
+        """
+        row_start = y // TILE_SIZE
+        row_end = (y + h - 1) // TILE_SIZE
+        if row_start < 0:
+            row_start = 0
+        if row_end >= self.height:
+            row_end = self.height - 1
+        found = []
+        if row_start > row_end:
+            return found
+
+        tiles = self.tiles
+        height = self.height
+        origin = self.origin
+        rows = range(row_start, row_end + 1)
+        for col in range(x // TILE_SIZE, (x + w - 1) // TILE_SIZE + 1):
+            if col < origin:
+                if col >= 0 and SOLID[self.evicted_type]:
+                    found.extend((col, row) for row in rows)
+                continue
+            if col >= self.width:
+                break
+            base = (col - origin) * height
+            for row in rows:
+                if SOLID[tiles[base + row]]:
+                    found.append((col, row))
+        return found
+
+    def column_cells(self, col_start, col_end):
+        """Zwraca niepuste komórki (col, row, typ) z zakresu kolumn [start, end)."""
+        tiles = self.tiles
+        height = self.height
+        found = []
+        for col in range(max(self.origin, col_start), min(self.width, col_end)):
+            base = (col - self.origin) * height
+            for row in range(height):
+                tile_type = tiles[base + row]
+                if tile_type != TYPE_EMPTY:
+                    found.append((col, row, tile_type))
+        return found
+
+    # --- Serializacja ---
+    def to_bytes(self):
+        name = self.theme_name.encode("ascii")
+        parts = [
+            _HEADER.pack(
+                _MAGIC,
+                self.width,
+                self.height,
+                len(self.enemies),
+                self.difficulty,
+                len(name),
+                self.spawn[0],
+                self.spawn[1],
+                0,
+            ),
+            name,
+        ]
+        parts.extend(struct.pack("<HH", e.col, e.row) for e in self.enemies)
+        parts.append(bytes(self.tiles))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (
+            magic,
+            width,
+            height,
+            enemy_count,
+            difficulty,
+            name_len,
+            spawn_x,
+            spawn_y,
+            _,
+        ) = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("Nieprawidłowe dane poziomu")
+        offset = _HEADER.size
+        theme_name = bytes(data[offset : offset + name_len]).decode("ascii")
+        offset += name_len
+
+        level = cls(height, theme_name, difficulty)
+        level.spawn = (spawn_x, spawn_y)
+        for col, row in struct.iter_unpack(
+            "<HH", data[offset : offset + 4 * enemy_count]
+        ):
+            level.enemies.append(EnemySpawn(col, row))
+        offset += 4 * enemy_count
+
+        level.width = width
+        level.tiles = bytearray(data[offset : offset + width * height])
+        return level
+
+
+def level_config(level_num):
+    """Motyw i trudność dla numeru poziomu."""
+    if level_num == 1:
+        return THEME_DAY, 1
+    return THEME_NIGHT, 2
+
+
+class LevelGenerator:
+    """Generator z własnym RNG - ten sam seed daje bajtowo identyczny poziom."""
+
+    def __init__(self, level_length_screens=10, seed=None):
+        self.level_width_tiles = (SCREEN_WIDTH // TILE_SIZE) * level_length_screens
+        self.rng = random.Random(seed)
+        self.current_x = 0
+        self.floor_y = (SCREEN_HEIGHT // TILE_SIZE) - 3
+        self.current_theme = THEME_DAY
+        self.level = None
+
+    def set_theme(self, theme):
+        self.current_theme = theme
+
+    def generate(self, difficulty=1, seed=None):
+        """Generuje poziom. difficulty wpływa na szansę na dziury i wrogów.
+
+        Podany seed resetuje RNG generatora; bez niego generator kontynuuje
+        własną sekwencję losową.
+        """
+        self.begin(difficulty, seed)
+
+        # 2. Proceduralna część
+        while self.current_x < self.level_width_tiles:
+            self.step()
+
+        # 3. Meta (Flaga)
+        self.create_finish_line()
+        return self.level
+
+    def iter_generate(self, difficulty=1, seed=None):
+        """Jak generate(), ale jako generator oddający sterowanie po każdym wzorcu.
+
+        Pozwala rozłożyć generowanie na wiele klatek; gotowy poziom jest
+        wartością StopIteration (wynikiem `yield from`). Ten sam seed daje
+        bajtowo ten sam poziom co generate().
+        """
+        self.begin(difficulty, seed)
+        while self.current_x < self.level_width_tiles:
+            self.step()
+            yield
+        self.create_finish_line()
+        return self.level
+
+    def begin(self, difficulty=1, seed=None):
+        """Zaczyna nowy poziom: pusta siatka i bezpieczna strefa startowa."""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.difficulty = difficulty
+        self.level = LevelData(self.floor_y + 5, self.current_theme.name, difficulty)
+        self.level.spawn = (100, (self.floor_y - 2) * TILE_SIZE)
+        self.current_x = 0
+
+        # 1. Start (bezpieczna strefa)
+        self.create_flat_ground(8)
+        return self.level
+
+    def step(self):
+        """Dokłada do poziomu jeden losowy wzorzec (płasko, dziura, rura...)."""
+        difficulty = self.difficulty
+
+        # Zmieniona logika losowania - mniej hord, więcej różnorodności
+        options = ["flat", "flat", "pipe", "gap", "stairs", "bricks"]
+        if difficulty > 1:
+            options.extend(["gap", "pipe"])  # Trudniej w poziomie 2
+
+        pattern = self.rng.choice(options)
+
+        if pattern == "flat":
+            length = self.rng.randint(3, 8)
+            # Zmniejszona szansa na wroga (0.2 zamiast 0.3)
+            self.create_flat_ground(length, spawn_enemy_chance=0.2 * difficulty)
+        elif pattern == "gap":
+            length = self.rng.randint(2, 3 if difficulty == 1 else 4)
+            self.create_gap(length)
+        elif pattern == "pipe":
+            self.create_pipe(height=self.rng.randint(2, 4))
+        elif pattern == "stairs":
+            self.create_stairs(direction=self.rng.choice([1, -1]))
+        elif pattern == "bricks":
+            self.create_floating_platform()
+
+    def _add_tile(self, x, y, type):
+        self.level.set_tile(x, y, type)
+
+    def _fill_ground_column(self, x, start_y):
+        self.level.fill_column(x, start_y, self.floor_y + 5, TYPE_GROUND)
+
+    def create_flat_ground(self, width, spawn_enemy_chance=0.0):
+        for _ in range(width):
+            self._add_tile(self.current_x, self.floor_y, TYPE_GROUND)
+            self._fill_ground_column(self.current_x, self.floor_y + 1)
+
+            # Spawnowanie wroga - dodano warunek odstępu, aby nie byli na sobie
+            if spawn_enemy_chance and self.rng.random() < spawn_enemy_chance:
+                # Tylko jeśli ostatni element dodany nie jest wrogiem (uproszczone)
+                self.level.enemies.append(EnemySpawn(self.current_x, self.floor_y - 1))
+
+            self.current_x += 1
+
+    def create_gap(self, width):
+        self.current_x += width
+
+    def create_pipe(self, height):
+        self._add_tile(self.current_x, self.floor_y, TYPE_GROUND)
+        self._fill_ground_column(self.current_x, self.floor_y + 1)
+
+        pipe_top_y = self.floor_y - height
+        for y in range(pipe_top_y, self.floor_y):
+            self._add_tile(self.current_x, y, TYPE_PIPE)
+
+        self.current_x += 1
+        self.create_flat_ground(2)
+
+    def create_stairs(self, direction=1):
+        height = self.rng.randint(3, 5)
+        if direction == 1:
+            steps = range(height)
+        else:
+            steps = range(height - 1, -1, -1)
+        for h in steps:
+            self.level.fill_column(
+                self.current_x, self.floor_y - h, self.floor_y + 1, TYPE_HARD
+            )
+            self._fill_ground_column(self.current_x, self.floor_y + 1)
+            self.current_x += 1
+        self.create_flat_ground(2)
+
+    def create_floating_platform(self):
+        width = self.rng.randint(3, 6)
+        plat_height = self.rng.randint(3, 4)
+        start_x = self.current_x
+        self.create_flat_ground(width)
+
+        for i in range(width):
+            self._add_tile(start_x + i, self.floor_y - plat_height, TYPE_BRICK)
+
+    def create_finish_line(self):
+        # Mała platforma przed flagą
+        self.create_flat_ground(3)
+
+        # Flaga (szczyt)
+        self._add_tile(self.current_x, self.floor_y - 3, TYPE_FLAG_TOP)
+        # Maszt (środek)
+        self._add_tile(self.current_x, self.floor_y - 2, TYPE_FLAG_POLE)
+        # Maszt (dół)
+        self._add_tile(self.current_x, self.floor_y - 1, TYPE_FLAG_POLE)
+
+        # Podstawa (blok twardy)
+        self._add_tile(self.current_x, self.floor_y, TYPE_HARD)
+        self._fill_ground_column(self.current_x, self.floor_y + 1)
+
+        self.current_x += 1
+        self.create_flat_ground(5)  # Za flagą
+        self.current_x += 5  # Bufor, żeby kamera dojechała
+
+
+class LevelStream:
+    """Poziom generowany leniwie, kilka ekranów przed graczem.
+
+    Kolumny i spawny wrogów dalej niż `evict_cols` za graczem są usuwane,
+    więc pamięć nie zależy od długości poziomu. Przy `length_screens=None`
+    poziom jest nieskończony; w przeciwnym razie na końcu stoi zwykła meta.
+    """
+
+    def __init__(
+        self,
+        generator,
+        difficulty=1,
+        seed=None,
+        length_screens=None,
+        lookahead_cols=3 * (SCREEN_WIDTH // TILE_SIZE),
+        evict_cols=2 * (SCREEN_WIDTH // TILE_SIZE),
+    ):
+        self.generator = generator
+        self.lookahead_cols = lookahead_cols
+        self.evict_cols = evict_cols
+        if length_screens is None:
+            self.length_cols = None
+        else:
+            self.length_cols = (SCREEN_WIDTH // TILE_SIZE) * length_screens
+        self.finished = False
+
+        self.level = generator.begin(difficulty, seed)
+        # Za granicą usuwania gracz trafia na ścianę zamiast w pustkę
+        self.level.evicted_type = TYPE_HARD
+
+    def advance(self, player_col):
+        """Dogenerowuje poziom przed graczem i usuwa kolumny za nim.
+
+        Zwraca listę nowych EnemySpawn; lista spawnów poziomu jest przy tym
+        czyszczona, bo wrogami zarządza od tej chwili wywołujący.
+        """
+        generator = self.generator
+        target = player_col + self.lookahead_cols
+        while not self.finished and generator.current_x < target:
+            if self.length_cols is not None and generator.current_x >= self.length_cols:
+                generator.create_finish_line()
+                self.finished = True
+            else:
+                generator.step()
+
+        self.level.evict_before(player_col - self.evict_cols)
+
+        spawns = self.level.enemies
+        self.level.enemies = []
+        return spawns
+
+
+def generate_level(seed, difficulty=1, level_length_screens=8, theme_name="day"):
+    """Generuje jeden poziom z samego seeda i zwraca jego bajty (LevelData.to_bytes)."""
+    generator = LevelGenerator(level_length_screens=level_length_screens, seed=seed)
+    generator.set_theme(THEMES[theme_name])
+    return generator.generate(difficulty).to_bytes()
+
+
+def _generate_chunk(args):
+    seeds, difficulty, level_length_screens, theme_name = args
+    generator = LevelGenerator(level_length_screens=level_length_screens)
+    generator.set_theme(THEMES[theme_name])
+    return [generator.generate(difficulty, seed=seed).to_bytes() for seed in seeds]
+
+
+def generate_batch(
+    seeds, difficulty=1, level_length_screens=8, theme_name="day", workers=None
+):
+    """Generuje wiele poziomów w puli procesów; wynik w kolejności seedów.
+
+    Seedy są dzielone na paczki, żeby koszt przesyłania między procesami
+    rozkładał się na wiele poziomów.
+    """
+    seeds = list(seeds)
+    workers = workers or os.cpu_count() or 1
+    per_chunk = max(1, len(seeds) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [
+            (seeds[i : i + per_chunk], difficulty, level_length_screens, theme_name)
+            for i in range(0, len(seeds), per_chunk)
+        ]
+        levels = []
+        for chunk in pool.map(_generate_chunk, jobs):
+            levels.extend(chunk)
+    return levels
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wsadowe generowanie poziomów")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--difficulty", type=int, default=1)
+    parser.add_argument("--screens", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    levels = generate_batch(
+        range(args.first_seed, args.first_seed + args.count),
+        args.difficulty,
+        args.screens,
+        workers=args.workers,
+    )
+    elapsed = time.perf_counter() - start
+    size = sum(len(data) for data in levels)
+    print(
+        f"{len(levels)} levels in {elapsed:.2f}s ({len(levels) / elapsed:.0f} levels/s, "
+        f"{size / len(levels) / 1024:.1f} KB/level)"
+    )
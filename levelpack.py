@@ -0,0 +1,227 @@
+"""Paczki poziomów: wiele poziomów w jednym pliku, czytane leniwie przez mmap.
+
+Układ pliku (little-endian):
+    nagłówek _HEADER: magia, wersja, liczba poziomów, przesunięcie indeksu
+    poziomy: bajty LevelData.to_bytes() jeden za drugim
+    indeks _ENTRY na poziom: przesunięcie i długość jego bajtów
+
+Indeks leży na końcu, więc paczkę pisze się strumieniowo. Odczyt poziomu N
+dotyka tylko jednego wpisu indeksu i bajtów tego poziomu - otwarcie paczki
+z tysiącami poziomów nie czyta pozostałych.
+
+Poziomy z zewnątrz (np. od modelu) przychodzą jako JSON z wierszami znaków:
+
+    {"theme": "day", "difficulty": 1, "rows": ["....", "..E.", "####"]}
+
+Znaki: LEGEND, 'E' to wróg (na pustym polu), 'S' to start gracza.
+
+    python levelpack.py build levels.pack --count 5000 --difficulty 2
+    python levelpack.py import custom.pack level1.json level2.json
+    python levelpack.py info levels.pack --level 1234
+    python levelpack.py export levels.pack 1234 level.json
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import time
+
+from level import EnemySpawn, LevelData, generate_batch
+from settings import *
+
+_HEADER = struct.Struct("<4sHHIQ")
+_ENTRY = struct.Struct("<QI")
+_MAGIC = b"AIP1"
+_VERSION = 1
+
+LEGEND = {
+    ".": TYPE_EMPTY,
+    "#": TYPE_GROUND,
+    "B": TYPE_BRICK,
+    "H": TYPE_HARD,
+    "P": TYPE_PIPE,
+    "|": TYPE_FLAG_POLE,
+    "F": TYPE_FLAG_TOP,
+}
+
+
+def write_pack(path, levels):
+    """Zapisuje poziomy (LevelData albo ich bajty) do paczki; zwraca ich liczbę."""
+    entries = []
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, 0, 0))
+        offset = _HEADER.size
+        for level in levels:
+            data = level if isinstance(level, (bytes, bytearray)) else level.to_bytes()
+            f.write(data)
+            entries.append((offset, len(data)))
+            offset += len(data)
+        f.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, len(entries), offset))
+    return len(entries)
+
+
+class LevelPack:
+    """Paczka otwarta przez mmap; pack[n] dekoduje poziom n przy każdym odczycie."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Pusta paczka poziomów") from None
+        magic, version, _, count, index_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError("Nieprawidłowa paczka poziomów")
+        if count == 0:
+            self.close()
+            raise ValueError("Paczka nie zawiera poziomów")
+        self.count = count
+        self._index_offset = index_offset
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start, length = self._entry(index)
+        with memoryview(self._map) as view:
+            return LevelData.from_bytes(view[start : start + length])
+
+    def _entry(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Numer poziomu poza paczką")
+        return _ENTRY.unpack_from(self._map, self._index_offset + index * _ENTRY.size)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Import z JSON ---
+def level_from_json(data):
+    """Buduje LevelData ze słownika {"theme", "difficulty", "rows"[, "spawn"]}."""
+    rows = data["rows"]
+    if not rows or len({len(row) for row in rows}) != 1:
+        raise ValueError("Wiersze poziomu muszą mieć równą, niezerową długość")
+    theme_name = data.get("theme", "day")
+    if theme_name not in THEMES:
+        raise ValueError(f"Nieznany motyw: {theme_name}")
+
+    level = LevelData(len(rows), theme_name, data.get("difficulty", 1))
+    spawn = data.get("spawn")
+    width = len(rows[0])
+    level.width = width
+    level.tiles = bytearray([TYPE_EMPTY]) * (width * len(rows))
+    for row, line in enumerate(rows):
+        for col, char in enumerate(line):
+            if char == "E":
+                level.enemies.append(EnemySpawn(col, row))
+            elif char == "S":
+                spawn = spawn or (col * TILE_SIZE, row * TILE_SIZE)
+            elif char in LEGEND:
+                if LEGEND[char] != TYPE_EMPTY:
+                    level.tiles[col * len(rows) + row] = LEGEND[char]
+            else:
+                raise ValueError(f"Nieznany znak {char!r} w wierszu {row}")
+    if spawn is None:
+        raise ValueError("Poziom bez punktu startu ('S' albo \"spawn\")")
+    level.spawn = tuple(spawn)
+    return level
+
+
+def level_to_json(level):
+    """Odwrotność level_from_json (dla poziomu z origin == 0)."""
+    chars = {tile_type: char for char, tile_type in LEGEND.items()}
+    rows = [
+        [chars.get(level.tile_at(col, row), "H") for col in range(level.width)]
+        for row in range(level.height)
+    ]
+    for enemy in level.enemies:
+        rows[enemy.row][enemy.col] = "E"
+    return {
+        "theme": level.theme_name,
+        "difficulty": level.difficulty,
+        "spawn": list(level.spawn),
+        "rows": ["".join(row) for row in rows],
+    }
+
+
+def _import_json(paths):
+    for path in paths:
+        with open(path) as f:
+            yield level_from_json(json.load(f))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paczki poziomów")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="paczka z generatora (zakres seedów)")
+    build.add_argument("out")
+    build.add_argument("--count", type=int, default=1000)
+    build.add_argument("--first-seed", type=int, default=0)
+    build.add_argument("--difficulty", type=int, default=1)
+    build.add_argument("--screens", type=int, default=8)
+    build.add_argument("--theme", choices=sorted(THEMES), default="day")
+    build.add_argument("--workers", type=int, default=None)
+
+    imported = commands.add_parser("import", help="paczka z plików JSON")
+    imported.add_argument("out")
+    imported.add_argument("json", nargs="+")
+
+    info = commands.add_parser("info", help="opis paczki i czas wczytania poziomu")
+    info.add_argument("pack")
+    info.add_argument("--level", type=int, default=0)
+
+    export = commands.add_parser("export", help="poziom z paczki jako JSON")
+    export.add_argument("pack")
+    export.add_argument("level", type=int)
+    export.add_argument("out")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        levels = generate_batch(
+            range(args.first_seed, args.first_seed + args.count),
+            args.difficulty,
+            args.screens,
+            args.theme,
+            workers=args.workers,
+        )
+        count = write_pack(args.out, levels)
+        print(f"{count} levels -> {args.out} in {time.perf_counter() - start:.2f}s")
+    elif args.command == "import":
+        count = write_pack(args.out, _import_json(args.json))
+        print(f"{count} levels -> {args.out}")
+    elif args.command == "export":
+        with LevelPack(args.pack) as pack:
+            level = pack[args.level]
+        with open(args.out, "w") as f:
+            json.dump(level_to_json(level), f, indent=1)
+        print(f"level {args.level} -> {args.out}")
+    else:
+        with LevelPack(args.pack) as pack:
+            opened = time.perf_counter()
+            level = pack[args.level]
+            loaded = time.perf_counter()
+        print(
+            f"{len(pack)} levels; open {(opened - start) * 1000:.2f} ms, "
+            f"level {args.level} ({level.width}x{level.height}, "
+            f"{len(level.enemies)} enemies, {level.theme_name}) "
+            f"in {(loaded - opened) * 1000:.3f} ms"
+        )
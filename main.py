@@ -1,70 +1,291 @@
+import argparse
+import collections
+import json
+import math
+import os
 import random
+import struct
 import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 import pygame
 
-# --- KONFIGURACJA (SETTINGS) ---
-SCREEN_WIDTH = 1920
-SCREEN_HEIGHT = 1080
-FPS = 60
-TILE_SIZE = 48
-
-# Fizyka i Ruch
-GRAVITY = 0.8
-WALK_SPEED = 7
-SPRINT_SPEED = 12  # Nowa prędkość sprintu
-JUMP_POWER = -22
-TERMINAL_VELOCITY = 15
-ENEMY_SPEED = 3
-
-# Typy kafelków
-TYPE_GROUND = 0
-TYPE_BRICK = 1
-TYPE_HARD = 2
-TYPE_PIPE = 3
-TYPE_FLAG_POLE = 98  # Maszt
-TYPE_FLAG_TOP = 99  # Sama flaga
-
-
-# --- DEFINICJE MOTYWÓW POZIOMÓW (COLORS) ---
-class LevelTheme:
-    def __init__(self, bg, ground, brick, pipe, enemy):
-        self.bg_color = bg
-        self.ground_color = ground
-        self.brick_color = brick
-        self.pipe_color = pipe
-        self.enemy_color = enemy
-
-
-# Motyw 1: Klasyczny Mario
-THEME_DAY = LevelTheme(
-    bg=(107, 140, 255),  # Sky Blue
-    ground=(200, 76, 12),  # Brownish
-    brick=(180, 50, 0),
-    pipe=(0, 180, 0),
-    enemy=(165, 42, 42),
-)
+from enemies import EnemySwarm
+from hud import GlyphAtlas, Hud
+from level import LevelData, LevelGenerator, LevelStream, generate_level, level_config
+from levelpack import LevelPack
+from navigation import NavGraph
+from physics import move_body, player_velocity
+from profiler import COLUMNS, FRAME, FrameProfiler
+from replay import Recording
+from settings import *
+
+# --- TEKSTURY (wspólne powierzchnie dla wszystkich sprite'ów) ---
+_texture_cache = {}
+
+
+def _cache_texture(key, image):
+    # Konwersja do formatu ekranu przyspiesza blit, ale wymaga otwartego okna
+    if pygame.display.get_surface() is not None:
+        image = image.convert()
+    _texture_cache[key] = image
+    return image
+
+
+def tile_texture(tile_type, theme):
+    """Zwraca wspólną, gotową teksturę kafelka dla pary (typ, motyw)."""
+    key = ("tile", tile_type, theme)
+    image = _texture_cache.get(key)
+    if image is None:
+        image = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        # Obsługa przezroczystości dla flagi
+        image.set_colorkey((255, 0, 255))
+        image.fill((255, 0, 255))
+        _draw_tile_texture(image, tile_type, theme)
+        image = _cache_texture(key, image)
+    return image
+
+
+def enemy_texture(color, size=TILE_SIZE):
+    """Zwraca wspólną teksturę wroga w danym kolorze (przy size < TILE_SIZE pomniejszoną)."""
+    key = ("enemy", color, size)
+    image = _texture_cache.get(key)
+    if image is None:
+        if size != TILE_SIZE:
+            image = pygame.transform.scale(enemy_texture(color), (size, size))
+            return _cache_texture(key, image)
+        image = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        image.fill(color)
 
-# Motyw 2: Jaskinia / Noc
-THEME_NIGHT = LevelTheme(
-    bg=(20, 20, 40),  # Dark Navy
-    ground=(100, 100, 110),  # Grey Stone
-    brick=(80, 80, 120),  # Blueish Bricks
-    pipe=(0, 120, 0),  # Darker Pipe
-    enemy=(120, 30, 30),  # Dark Red
-)
+        # Oczy
+        pygame.draw.rect(image, BLACK, (5, 10, 10, 15))
+        pygame.draw.rect(image, BLACK, (TILE_SIZE - 15, 10, 10, 15))
+        image = _cache_texture(key, image)
+    return image
+
+
+def _draw_tile_texture(image, tile_type, theme):
+    if tile_type == TYPE_GROUND:
+        image.fill(theme.ground_color)
+        pygame.draw.rect(image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 1)
+
+    elif tile_type == TYPE_BRICK:
+        image.fill(theme.brick_color)
+        pygame.draw.line(
+            image, BLACK, (0, TILE_SIZE // 2), (TILE_SIZE, TILE_SIZE // 2), 2
+        )
+        pygame.draw.line(
+            image,
+            BLACK,
+            (TILE_SIZE // 2, 0),
+            (TILE_SIZE // 2, TILE_SIZE // 2),
+            2,
+        )
+        pygame.draw.line(
+            image,
+            BLACK,
+            (TILE_SIZE // 4, TILE_SIZE // 2),
+            (TILE_SIZE // 4, TILE_SIZE),
+            2,
+        )
+        pygame.draw.rect(image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 1)
+
+    elif tile_type == TYPE_PIPE:
+        image.fill(theme.pipe_color)
+        pygame.draw.rect(image, PIPE_HIGHLIGHT, (5, 0, 10, TILE_SIZE))
+        pygame.draw.rect(image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 2)
+
+    elif tile_type == TYPE_HARD:
+        image.fill((80, 80, 80))
+        pygame.draw.rect(image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 1)
+
+    elif tile_type == TYPE_FLAG_POLE:
+        # Rysujemy szary maszt
+        pygame.draw.rect(image, (200, 200, 200), (TILE_SIZE // 2 - 2, 0, 4, TILE_SIZE))
+
+    elif tile_type == TYPE_FLAG_TOP:
+        # Szczyt masztu + flaga
+        pygame.draw.rect(image, (200, 200, 200), (TILE_SIZE // 2 - 2, 0, 4, TILE_SIZE))
+        # Trójkątna flaga
+        pygame.draw.polygon(
+            image,
+            (255, 255, 0),
+            [
+                (TILE_SIZE // 2 + 2, 2),
+                (TILE_SIZE - 2, TILE_SIZE // 4),
+                (TILE_SIZE // 2 + 2, TILE_SIZE // 2),
+            ],
+        )
 
-# Kolory stałe
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-PLAYER_COLOR = (255, 0, 0)
-PIPE_HIGHLIGHT = (50, 220, 50)
+
+# --- TŁO (warstwy paralaksy) ---
+PARALLAX_COLORKEY = (255, 0, 255)
+
+
+def parallax_strip(layer, view_width=SCREEN_WIDTH):
+    """Zwraca pas warstwy tła szerokości kadru, zapętlony w poziomie.
+
+    Rysowany raz na warstwę i rozdzielczość wewnętrzną; dalej tylko blit.
+    """
+    key = ("parallax", layer, view_width)
+    image = _texture_cache.get(key)
+    if image is None:
+        if view_width != SCREEN_WIDTH:
+            image = pygame.transform.scale(
+                parallax_strip(layer),
+                (view_width, layer.height * view_width // SCREEN_WIDTH),
+            )
+        else:
+            image = pygame.Surface((SCREEN_WIDTH, layer.height))
+            image.fill(PARALLAX_COLORKEY)
+            # Ten sam motyw zawsze daje ten sam rysunek
+            rng = random.Random(f"{layer.kind}/{layer.color}/{layer.top}")
+            _draw_parallax_layer(image, layer, rng)
+        # RLE przyspiesza blit dużych, w większości przezroczystych powierzchni
+        image.set_colorkey(PARALLAX_COLORKEY, pygame.RLEACCEL)
+        image = _cache_texture(key, image)
+    return image
+
+
+def _draw_parallax_layer(image, layer, rng):
+    width, height = image.get_size()
+    color = layer.color
+    if layer.kind in ("hills", "ridge"):
+        if layer.kind == "hills":
+            # Suma sinusów o całkowitej liczbie okresów na pas - brzegi się zgadzają
+            waves = [
+                (k, rng.uniform(0.3, 1.0), rng.uniform(0, 2 * math.pi))
+                for k in (2, 3, 5)
+            ]
+            total = sum(amplitude for _, amplitude, _ in waves)
+            tops = [
+                sum(a * math.sin(2 * math.pi * k * x / width + p) for k, a, p in waves)
+                / total
+                for x in range(0, width + 1, 8)
+            ]
+            xs = range(0, width + 1, 8)
+        else:
+            # Łamana z losowych wierzchołków; ostatni równy pierwszemu
+            xs = range(0, width + 1, 60)
+            tops = [rng.uniform(-1, 1) for _ in xs]
+            tops[-1] = tops[0]
+        points = [(x, int(height * (0.5 - 0.4 * top))) for x, top in zip(xs, tops)]
+        pygame.draw.polygon(image, color, [(0, height), *points, (width, height)])
+    elif layer.kind == "clouds":
+        for _ in range(7):
+            x = rng.randrange(width)
+            y = rng.randrange(height // 6, height * 2 // 3)
+            w = rng.randrange(140, 280)
+            # Chmura przy prawym brzegu wychodzi z lewej strony pasa
+            for dx in (-width, 0, width):
+                for i in range(3):
+                    part = pygame.Rect(0, 0, w * (3 - abs(i - 1)) // 4, w // 3)
+                    part.center = (x + dx + (i - 1) * w // 3, y - (i == 1) * w // 8)
+                    pygame.draw.ellipse(image, color, part)
+    elif layer.kind == "stalactites":
+        x = 0
+        while x < width:
+            w = rng.randrange(30, 90)
+            w = min(w, width - x)
+            length = rng.randrange(height // 4, height)
+            pygame.draw.polygon(
+                image, color, [(x, 0), (x + w, 0), (x + w // 2, length)]
+            )
+            x += w + rng.randrange(0, 60)
+        # Pasek skały u góry łączy sople
+        image.fill(color, (0, 0, width, height // 12))
+
+
+def draw_parallax(surface, theme, offset_x, view_width=SCREEN_WIDTH):
+    """Rysuje warstwy tła motywu przy przesunięciu kamery `offset_x` (piksele świata).
+
+    Każda warstwa to co najwyżej dwa blity zapętlonego pasa - koszt nie zależy
+    od długości poziomu ani od szczegółów rysunku.
+    """
+    for layer in theme.layers:
+        strip = parallax_strip(layer, view_width)
+        width = strip.get_width()
+        shift = int(-offset_x * layer.speed) * view_width // SCREEN_WIDTH % width
+        y = layer.top * view_width // SCREEN_WIDTH
+        surface.blit(strip, (-shift, y))
+        if shift:
+            surface.blit(strip, (width - shift, y))
+
+
+# --- CZCIONKI (ścieżki z bazy fontów systemu pamiętane na dysku) ---
+FONT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "aismb",
+    "fonts.json",
+)
+_font_paths = None
+
+
+def _load_font_paths():
+    global _font_paths
+    if _font_paths is None:
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                _font_paths = json.load(f)
+        except (OSError, ValueError):
+            _font_paths = {}
+    return _font_paths
+
+
+def _save_font_paths(paths):
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        with open(FONT_CACHE_PATH, "w") as f:
+            json.dump(paths, f)
+    except OSError:
+        pass  # Bez zapisu pamięć podręczna działa tylko do końca procesu
+
+
+def font_path(name):
+    """Ścieżka fontu systemu `name`; bazę fontów przeszukujemy raz na maszynę.
+
+    Znaleziona ścieżka (albo None - domyślny font pygame) trafia do
+    FONT_CACHE_PATH; usunięcie pliku wymusza ponowne wyszukanie.
+    """
+    paths = _load_font_paths()
+    path = paths.get(name, "")
+    if path == "" or (path is not None and not os.path.exists(path)):
+        path = pygame.font.match_font(name)
+        paths[name] = path
+        _save_font_paths(paths)
+    return path
+
+
+def system_font(name, size):
+    """Jak pygame.font.SysFont, ale ze ścieżką z font_path.
+
+    Zwraca nowy obiekt - Font nie przeżywa pygame.quit(), więc trzyma go
+    wywołujący (Game.get_font) tylko na czas jednej inicjalizacji fontów.
+    """
+    return pygame.font.Font(font_path(name), size)
+
+
+def read_keyboard():
+    """Zamienia aktualny stan klawiatury na maskę wejścia."""
+    keys = pygame.key.get_pressed()
+    controls = 0
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        controls |= INPUT_LEFT
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        controls |= INPUT_RIGHT
+    if keys[pygame.K_SPACE] or keys[pygame.K_w] or keys[pygame.K_UP]:
+        controls |= INPUT_JUMP
+    if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
+        controls |= INPUT_SPRINT
+    return controls
 
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.Surface((TILE_SIZE - 10, TILE_SIZE - 4))
+        self.image = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT))
         self.image.fill(PLAYER_COLOR)
         self.rect = self.image.get_rect()
         self.rect.x = x
@@ -76,439 +297,776 @@ class Player(pygame.sprite.Sprite):
         self.alive = True
         self.finished_level = False  # Czy dotknął flagi
 
-    def update(self, tiles, enemies, flags):
+    def update(self, level, enemies, controls=None):
         if not self.alive:
             return
 
-        keys = pygame.key.get_pressed()
-        self.vel_x = 0
-
-        # --- STEROWANIE ---
-        # Sprint (Shift)
-        current_speed = WALK_SPEED
-        if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
-            current_speed = SPRINT_SPEED
-
-        # Lewo (Strzałka lub A)
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.vel_x = -current_speed
-        # Prawo (Strzałka lub D)
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.vel_x = current_speed
-
-        # Skok (Spacja, W lub Strzałka w górę)
-        if (
-            keys[pygame.K_SPACE] or keys[pygame.K_w] or keys[pygame.K_UP]
-        ) and self.on_ground:
-            self.jump()
-
-        # Grawitacja
-        self.vel_y += GRAVITY
-        if self.vel_y > TERMINAL_VELOCITY:
-            self.vel_y = TERMINAL_VELOCITY
+        if controls is None:
+            controls = read_keyboard()
 
-        # Ruch X
-        self.rect.x += self.vel_x
-        self.collide_tiles(tiles, "x")
-
-        # Ruch Y
-        self.rect.y += self.vel_y
-        self.on_ground = False
-        self.collide_tiles(tiles, "y")
+        # Sterowanie i grawitacja, potem ruch z kolizjami - wspólne z analizatorem
+        self.vel_x, self.vel_y = player_velocity(controls, self.vel_y, self.on_ground)
+        self.rect.x, self.rect.y, self.vel_y, self.on_ground = move_body(
+            level, *self.rect, self.vel_x, self.vel_y
+        )
 
         # Interakcje
         self.collide_enemies(enemies)
-        self.collide_flags(flags)
+        self.collide_flags(level)
 
         # Śmierć od upadku
         if self.rect.top > SCREEN_HEIGHT + TILE_SIZE:
             self.alive = False
 
-    def jump(self):
-        self.vel_y = JUMP_POWER
-
     def bounce(self):
         self.vel_y = JUMP_POWER * 0.7
 
-    def collide_tiles(self, tiles, direction):
-        hits = pygame.sprite.spritecollide(self, tiles, False)
-        for tile in hits:
-            # Ignoruj kolizję z elementami flagi (można przez nie przenikać)
-            if tile.tile_type in [TYPE_FLAG_POLE, TYPE_FLAG_TOP]:
-                continue
-
-            if direction == "x":
-                if self.vel_x > 0:
-                    self.rect.right = tile.rect.left
-                elif self.vel_x < 0:
-                    self.rect.left = tile.rect.right
-            if direction == "y":
-                if self.vel_y > 0:
-                    self.rect.bottom = tile.rect.top
-                    self.vel_y = 0
-                    self.on_ground = True
-                elif self.vel_y < 0:
-                    self.rect.top = tile.rect.bottom
-                    self.vel_y = 0
-
     def collide_enemies(self, enemies):
-        hits = pygame.sprite.spritecollide(self, enemies, False)
-        for enemy in hits:
-            if enemy.alive:
-                if self.vel_y > 0 and self.rect.bottom < enemy.rect.centery + 15:
-                    enemy.die()
-                    self.bounce()
-                else:
-                    self.alive = False
+        for index in enemies.overlapping(*self.rect):
+            if self.vel_y > 0 and self.rect.bottom < enemies.centery(index) + 15:
+                enemies.die(index)
+                self.bounce()
+            else:
+                self.alive = False
 
-    def collide_flags(self, flags):
+    def collide_flags(self, level):
         # Sprawdzenie czy dotknęliśmy flagi
-        if pygame.sprite.spritecollide(self, flags, False):
-            self.finished_level = True
+        for _, _, tile_type in level.cells(*self.rect):
+            if tile_type in FLAG_TYPES:
+                self.finished_level = True
 
 
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, x, y, color):
+class Tile(pygame.sprite.Sprite):
+    def __init__(self, x, y, tile_type, theme):
         super().__init__()
-        self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-        self.image.fill(color)
-
-        # Oczy
-        pygame.draw.rect(self.image, BLACK, (5, 10, 10, 15))
-        pygame.draw.rect(self.image, BLACK, (TILE_SIZE - 15, 10, 10, 15))
+        # Wspólna tekstura z pamięci podręcznej zamiast własnej powierzchni
+        self.image = tile_texture(tile_type, theme)
 
+        self.tile_type = tile_type
+        self.theme = theme
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
-        self.vel_x = -ENEMY_SPEED
-        self.vel_y = 0
-        self.alive = True
-
-    def update(self, tiles):
-        if not self.alive:
-            self.kill()
-            return
-
-        self.vel_y += GRAVITY
-        self.rect.x += self.vel_x
-
-        hits_x = pygame.sprite.spritecollide(self, tiles, False)
-        # Ignoruj kolizje z flagami dla wrogów też
-        hits_x = [
-            t for t in hits_x if t.tile_type not in [TYPE_FLAG_POLE, TYPE_FLAG_TOP]
-        ]
-
-        if hits_x:
-            if self.vel_x > 0:
-                self.rect.right = hits_x[0].rect.left
-                self.vel_x = -ENEMY_SPEED
-            else:
-                self.rect.left = hits_x[0].rect.right
-                self.vel_x = ENEMY_SPEED
-
-        self.rect.y += self.vel_y
-        hits_y = pygame.sprite.spritecollide(self, tiles, False)
-        hits_y = [
-            t for t in hits_y if t.tile_type not in [TYPE_FLAG_POLE, TYPE_FLAG_TOP]
-        ]
 
-        if hits_y:
-            if self.vel_y > 0:
-                self.rect.bottom = hits_y[0].rect.top
-                self.vel_y = 0
 
-        if self.rect.y > SCREEN_HEIGHT + 200:
-            self.alive = False
+class ChunkLayer:
+    """Statyczna warstwa kafelków wypiekana w pasy szerokości ekranu.
 
-    def die(self):
-        self.alive = False
+    Pasy powstają przy pierwszym pojawieniu się w kadrze - sprite'y kafelków
+    są tworzone tylko dla kolumn pasa i zaraz potem odrzucane. Przy obniżonej
+    rozdzielczości wewnętrznej (`view_width` < SCREEN_WIDTH) pasy są od razu
+    pomniejszane, więc rysowanie kosztuje tyle, ile mały bufor.
 
+    Pas ekranu to kilka MiB, więc w pamięci zostaje tylko MAX_CHUNKS ostatnio
+    rysowanych (LRU) - pasy daleko za kamerą wypiekamy ponownie, gdy wrócą.
+    """
 
-class Tile(pygame.sprite.Sprite):
-    def __init__(self, x, y, tile_type, theme):
-        super().__init__()
-        self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-        # Obsługa przezroczystości dla flagi
-        self.image.set_colorkey((255, 0, 255))
-        self.image.fill((255, 0, 255))
+    CHUNK_WIDTH = SCREEN_WIDTH
+    COLORKEY = (255, 0, 255)
+    MAX_CHUNKS = 4  # Dwa widoczne i po jednym z każdej strony
 
-        self.tile_type = tile_type
+    def __init__(self):
+        self.chunks = collections.OrderedDict()
+        self.level = None
+        self.theme = THEME_DAY
+        self.view_width = SCREEN_WIDTH
+
+    def set_view_width(self, view_width):
+        """Zmienia rozdzielczość wewnętrzną; wypieczone pasy tracą ważność."""
+        if view_width != self.view_width:
+            self.view_width = view_width
+            self.chunks.clear()
+
+    def bake(self, level, theme):
+        """Przypisuje nowy poziom; stare pasy tracą ważność."""
+        self.chunks.clear()
+        self.level = level
         self.theme = theme
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
-        self.draw_texture()
-
-    def draw_texture(self):
-        if self.tile_type == TYPE_GROUND:
-            self.image.fill(self.theme.ground_color)
-            pygame.draw.rect(self.image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 1)
 
-        elif self.tile_type == TYPE_BRICK:
-            self.image.fill(self.theme.brick_color)
-            pygame.draw.line(
-                self.image, BLACK, (0, TILE_SIZE // 2), (TILE_SIZE, TILE_SIZE // 2), 2
+    def _bake_chunk(self, index):
+        chunk = pygame.Surface((self.CHUNK_WIDTH, SCREEN_HEIGHT))
+        chunk.fill(self.COLORKEY)
+        chunk.set_colorkey(self.COLORKEY)
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()
+
+        cols = self.CHUNK_WIDTH // TILE_SIZE
+        tiles = pygame.sprite.Group(
+            Tile(
+                col * TILE_SIZE - index * self.CHUNK_WIDTH,
+                row * TILE_SIZE,
+                t,
+                self.theme,
             )
-            pygame.draw.line(
-                self.image,
-                BLACK,
-                (TILE_SIZE // 2, 0),
-                (TILE_SIZE // 2, TILE_SIZE // 2),
-                2,
-            )
-            pygame.draw.line(
-                self.image,
-                BLACK,
-                (TILE_SIZE // 4, TILE_SIZE // 2),
-                (TILE_SIZE // 4, TILE_SIZE),
-                2,
+            for col, row, t in self.level.column_cells(index * cols, (index + 1) * cols)
+        )
+        tiles.draw(chunk)
+        if self.view_width != SCREEN_WIDTH:
+            # Najbliższy sąsiad - wygładzanie rozmyłoby kolor przezroczystości na brzegach
+            chunk = pygame.transform.scale(
+                chunk,
+                (self.view_width, SCREEN_HEIGHT * self.view_width // SCREEN_WIDTH),
             )
-            pygame.draw.rect(self.image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 1)
+            chunk.set_colorkey(self.COLORKEY)
+        self.chunks[index] = chunk
+        if len(self.chunks) > self.MAX_CHUNKS:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def draw(self, surface, offset_x):
+        """Rysuje widoczne pasy przy przesunięciu kamery `offset_x` (piksele świata)."""
+        # Pasy całkowicie za usuniętymi kolumnami (tryb strumieniowy) są zwalniane
+        evicted = self.level.origin * TILE_SIZE // self.CHUNK_WIDTH
+        for index in [index for index in self.chunks if index < evicted]:
+            del self.chunks[index]
+
+        # Widoczne są co najwyżej dwa sąsiednie pasy
+        view_width = self.view_width
+        first = max(0, -offset_x // self.CHUNK_WIDTH)
+        last = (SCREEN_WIDTH - 1 - offset_x) // self.CHUNK_WIDTH
+        for index in range(first, last + 1):
+            chunk = self.chunks.get(index)
+            if chunk is None:
+                chunk = self._bake_chunk(index)
+            else:
+                self.chunks.move_to_end(index)
+            x = (index * self.CHUNK_WIDTH + offset_x) * view_width // SCREEN_WIDTH
+            surface.blit(chunk, (x, 0))
 
-        elif self.tile_type == TYPE_PIPE:
-            self.image.fill(self.theme.pipe_color)
-            pygame.draw.rect(self.image, PIPE_HIGHLIGHT, (5, 0, 10, TILE_SIZE))
-            pygame.draw.rect(self.image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 2)
 
-        elif self.tile_type == TYPE_HARD:
-            self.image.fill((80, 80, 80))
-            pygame.draw.rect(self.image, BLACK, (0, 0, TILE_SIZE, TILE_SIZE), 1)
+class Camera:
+    def __init__(self, width, height):
+        self.camera = pygame.Rect(0, 0, width, height)
+        self.width = width
+        self.height = height
 
-        elif self.tile_type == TYPE_FLAG_POLE:
-            # Rysujemy szary maszt
-            pygame.draw.rect(
-                self.image, (200, 200, 200), (TILE_SIZE // 2 - 2, 0, 4, TILE_SIZE)
-            )
+    def update(self, target):
+        x = -target.rect.centerx + int(SCREEN_WIDTH / 2)
+        y = -target.rect.centery + int(SCREEN_HEIGHT / 2)
+        x = min(0, x)
+        self.camera = pygame.Rect(x, 0, self.width, self.height)
 
-        elif self.tile_type == TYPE_FLAG_TOP:
-            # Szczyt masztu + flaga
-            pygame.draw.rect(
-                self.image, (200, 200, 200), (TILE_SIZE // 2 - 2, 0, 4, TILE_SIZE)
-            )
-            # Trójkątna flaga
-            pygame.draw.polygon(
-                self.image,
-                (255, 255, 0),
-                [
-                    (TILE_SIZE // 2 + 2, 2),
-                    (TILE_SIZE - 2, TILE_SIZE // 4),
-                    (TILE_SIZE // 2 + 2, TILE_SIZE // 2),
-                ],
-            )
 
+def _no_mark(name):
+    pass
+
+
+class World:
+    """Stan symulacji (poziom, gracz, wrogowie) - bez okna i bez rysowania."""
+
+    def __init__(
+        self,
+        level_length_screens=8,
+        streaming=False,
+        endless=False,
+        smart_enemies=False,
+    ):
+        self.level_gen = LevelGenerator(level_length_screens=level_length_screens)
+        self.level_length_screens = level_length_screens
+        # Tryb strumieniowy: poziom powstaje przed kamerą, a znika za graczem
+        self.streaming = streaming or endless
+        self.endless = endless
+        self.stream = None
+        # Graf nawigacji zmieniałby się z każdą porcją strumienia - tylko całe poziomy
+        if smart_enemies and self.streaming:
+            raise ValueError("Sprytni wrogowie wymagają poziomu bez strumieniowania")
+        self.smart_enemies = smart_enemies
+        self.navigation = None
+        self.current_level_num = 1
+        self.seed = None
+        self.initial = None  # Migawka stanu z chwili załadowania poziomu
+        # Przy rysowaniu z interpolacją pamiętamy pozycje sprzed ostatniego kroku
+        self.track_previous = False
+        self.previous = None
+
+    def load_level(self, seed=None, level=None):
+        """Ładuje poziom current_level_num; bez seeda losuje nowy.
+
+        Gotowy `level` (np. wygenerowany w tle albo z paczki) jest tylko
+        podmieniany i przynosi własny motyw.
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
 
-class LevelGenerator:
-    def __init__(self, level_length_screens=10):
-        self.level_width_tiles = (SCREEN_WIDTH // TILE_SIZE) * level_length_screens
-        self.tiles = pygame.sprite.Group()
-        self.enemies = pygame.sprite.Group()
-        self.flags = pygame.sprite.Group()  # Nowa grupa dla flagi
-        self.current_x = 0
-        self.floor_y = (SCREEN_HEIGHT // TILE_SIZE) - 3
-        self.current_theme = THEME_DAY
-
-    def set_theme(self, theme):
-        self.current_theme = theme
-
-    def generate(self, difficulty=1):
-        """Generuje poziom. difficulty wpływa na szansę na dziury i wrogów."""
-        self.tiles.empty()
-        self.enemies.empty()
-        self.flags.empty()
-        self.current_x = 0
-
-        # 1. Start (bezpieczna strefa)
-        self.create_flat_ground(8)
-
-        # 2. Proceduralna część
-        while self.current_x < self.level_width_tiles:
-            # Zmieniona logika losowania - mniej hord, więcej różnorodności
-            options = ["flat", "flat", "pipe", "gap", "stairs", "bricks"]
-            if difficulty > 1:
-                options.extend(["gap", "pipe"])  # Trudniej w poziomie 2
-
-            pattern = random.choice(options)
-
-            if pattern == "flat":
-                length = random.randint(3, 8)
-                # Zmniejszona szansa na wroga (0.2 zamiast 0.3)
-                self.create_flat_ground(length, spawn_enemy_chance=0.2 * difficulty)
-            elif pattern == "gap":
-                length = random.randint(2, 3 if difficulty == 1 else 4)
-                self.create_gap(length)
-            elif pattern == "pipe":
-                self.create_pipe(height=random.randint(2, 4))
-            elif pattern == "stairs":
-                self.create_stairs(direction=random.choice([1, -1]))
-            elif pattern == "bricks":
-                self.create_floating_platform()
-
-        # 3. Meta (Flaga)
-        self.create_finish_line()
-
-        return (
-            self.tiles,
-            self.enemies,
-            self.flags,
-            (100, (self.floor_y - 2) * TILE_SIZE),
-        )
+        # Konfiguracja poziomu w zależności od numeru
+        theme, difficulty = level_config(self.current_level_num)
+        if level is not None and not self.streaming:
+            theme = THEMES[level.theme_name]
 
-    def _add_tile(self, x, y, type):
-        t = Tile(x * TILE_SIZE, y * TILE_SIZE, type, self.current_theme)
-        if type in [TYPE_FLAG_POLE, TYPE_FLAG_TOP]:
-            self.flags.add(t)
-        self.tiles.add(t)
-
-    def _fill_ground_column(self, x, start_y):
-        for y in range(start_y, self.floor_y + 5):
-            self._add_tile(x, y, TYPE_GROUND)
-
-    def create_flat_ground(self, width, spawn_enemy_chance=0.0):
-        for _ in range(width):
-            self._add_tile(self.current_x, self.floor_y, TYPE_GROUND)
-            self._fill_ground_column(self.current_x, self.floor_y + 1)
-
-            # Spawnowanie wroga - dodano warunek odstępu, aby nie byli na sobie
-            if random.random() < spawn_enemy_chance:
-                # Tylko jeśli ostatni element dodany nie jest wrogiem (uproszczone)
-                enemy = Enemy(
-                    self.current_x * TILE_SIZE,
-                    (self.floor_y - 1) * TILE_SIZE,
-                    self.current_theme.enemy_color,
-                )
-                self.enemies.add(enemy)
+        self.level_gen.set_theme(theme)
+        self.theme = theme
 
-            self.current_x += 1
+        # Generowanie - kompaktowy model; sprite'y wrogów tworzymy z listy spawnów
+        self.enemies = EnemySwarm()
+        if self.streaming:
+            self.stream = LevelStream(
+                self.level_gen,
+                difficulty,
+                seed,
+                length_screens=None if self.endless else self.level_length_screens,
+            )
+            self.level = self.stream.level
+            spawns = self.stream.advance(self.level.spawn[0] // TILE_SIZE)
+        else:
+            self.stream = None
+            if level is None:
+                level = self.level_gen.generate(difficulty, seed=seed)
+            self.level = level
+            spawns = self.level.enemies
+        self.enemies.add_spawns(spawns)
+
+        # Graf nawigacji budujemy raz na poziom; ten sam poziom zachowuje go
+        if self.smart_enemies:
+            if self.navigation is None or self.navigation.level is not self.level:
+                self.navigation = NavGraph(self.level)
+            self.enemies.navigation = self.navigation
 
-    def create_gap(self, width):
-        self.current_x += width
+        # Gracz
+        self.player = Player(*self.level.spawn)
+        self.all_sprites = pygame.sprite.Group()
+        self.all_sprites.add(self.player)
 
-    def create_pipe(self, height):
-        self._add_tile(self.current_x, self.floor_y, TYPE_GROUND)
-        self._fill_ground_column(self.current_x, self.floor_y + 1)
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.camera.update(self.player)
+        self._activate_enemies()
+        self.game_over = False
+        self.win = False
+        self.previous = None
+        self.ticks = 0  # Kroki symulacji od wejścia na poziom (licznik czasu)
+
+        # Migawka stanu początkowego - restart tego samego poziomu bez generowania.
+        # Strumień dokleja i usuwa kolumny w trakcie gry, więc tam odtwarzamy z seeda.
+        self.initial = None
+        if self.stream is None:
+            self.initial = (
+                bytes(self.level.tiles),
+                self.level.spawn,
+                self.enemies.snapshot(),
+            )
 
-        pipe_top_y = self.floor_y - height
-        for y in range(pipe_top_y, self.floor_y):
-            self._add_tile(self.current_x, y, TYPE_PIPE)
+    def restart_level(self):
+        """Wraca do stanu z chwili załadowania bieżącego poziomu.
+
+        Zwraca True, jeśli zmieniła się siatka poziomu (trzeba ją przerysować).
+        """
+        if self.initial is None:
+            self.load_level(self.seed)
+            return True
+
+        tiles, spawn, enemies = self.initial
+        changed = self.level.tiles != tiles
+        if changed:
+            # Siatka zmieniona w trakcie gry - graf i kopia siatki wrogów od nowa
+            self.level.tiles[:] = tiles
+            if self.smart_enemies:
+                self.navigation = NavGraph(self.level)
+            self.enemies = EnemySwarm(navigation=self.navigation)
+        self.enemies.restore(enemies)
+
+        self.player = Player(*spawn)
+        self.all_sprites = pygame.sprite.Group()
+        self.all_sprites.add(self.player)
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.camera.update(self.player)
+        self.game_over = False
+        self.win = False
+        self.previous = None
+        self.ticks = 0  # Kroki symulacji od wejścia na poziom (licznik czasu)
+        return changed
+
+    def enter_level(self, level_num, seed):
+        """Poziom `level_num` z danego seeda; bieżący poziom wraca z migawki.
+
+        Zwraca True, jeśli poziom powstał od nowa albo zmieniła się jego siatka.
+        """
+        if self.initial is not None and (level_num, seed) == (
+            self.current_level_num,
+            self.seed,
+        ):
+            return self.restart_level()
+        self.current_level_num = level_num
+        self.load_level(seed)
+        return True
+
+    def _activate_enemies(self):
+        # Symulowani są tylko wrogowie w pobliżu kadru; reszta śpi
+        left = -self.camera.camera.x
+        self.enemies.activate(left, left + self.camera.width)
+
+    def update(self, controls=None, mark=_no_mark):
+        """Jeden krok symulacji. controls=None oznacza odczyt klawiatury.
+
+        `mark` dostaje nazwę każdej zakończonej części kroku (FrameProfiler.mark).
+        """
+        if self.track_previous:
+            self.previous = (
+                self.player.rect.x,
+                self.player.rect.y,
+                self.camera.camera.x,
+                self.enemies.x.copy(),
+                self.enemies.y.copy(),
+            )
+        self.ticks += 1
+        self.all_sprites.update(self.level, self.enemies, controls)
+        mark("update.player")
+        self.enemies.update(self.level, self.player.rect)
+        mark("update.enemies")
+        self.camera.update(self.player)
 
-        self.current_x += 1
-        self.create_flat_ground(2)
+        if self.stream is not None:
+            spawns = self.stream.advance(self.player.rect.centerx // TILE_SIZE)
+            if spawns:
+                self.enemies.add_spawns(spawns)
+            # Wrogowie za granicą usuwania znikają razem z kolumnami
+            self.enemies.kill_left_of(self.level.origin * TILE_SIZE)
+        self._activate_enemies()
 
-    def create_stairs(self, direction=1):
-        height = random.randint(3, 5)
-        if direction == 1:
-            for h in range(height):
-                for y in range(self.floor_y - h, self.floor_y + 1):
-                    self._add_tile(self.current_x, y, TYPE_HARD)
-                self._fill_ground_column(self.current_x, self.floor_y + 1)
-                self.current_x += 1
-        else:
-            for h in range(height - 1, -1, -1):
-                for y in range(self.floor_y - h, self.floor_y + 1):
-                    self._add_tile(self.current_x, y, TYPE_HARD)
-                self._fill_ground_column(self.current_x, self.floor_y + 1)
-                self.current_x += 1
-        self.create_flat_ground(2)
-
-    def create_floating_platform(self):
-        width = random.randint(3, 6)
-        plat_height = random.randint(3, 4)
-        start_x = self.current_x
-        self.create_flat_ground(width)
-
-        for i in range(width):
-            self._add_tile(start_x + i, self.floor_y - plat_height, TYPE_BRICK)
-
-    def create_finish_line(self):
-        # Mała platforma przed flagą
-        self.create_flat_ground(3)
-
-        # Flaga (szczyt)
-        self._add_tile(self.current_x, self.floor_y - 3, TYPE_FLAG_TOP)
-        # Maszt (środek)
-        self._add_tile(self.current_x, self.floor_y - 2, TYPE_FLAG_POLE)
-        # Maszt (dół)
-        self._add_tile(self.current_x, self.floor_y - 1, TYPE_FLAG_POLE)
-
-        # Podstawa (blok twardy)
-        self._add_tile(self.current_x, self.floor_y, TYPE_HARD)
-        self._fill_ground_column(self.current_x, self.floor_y + 1)
-
-        self.current_x += 1
-        self.create_flat_ground(5)  # Za flagą
-        self.current_x += 5  # Bufor, żeby kamera dojechała
+        # Sprawdzenie czy gracz żyje
+        if not self.player.alive:
+            self.game_over = True
+            self.win = False
 
+        # Sprawdzenie czy gracz dotarł do flagi
+        if self.player.finished_level:
+            self.game_over = True
+            self.win = True
+        mark("update.world")
+
+    def checksum(self):
+        """CRC32 stanu symulacji: gracz, wrogowie i siatka poziomu."""
+        player = self.player
+        state = struct.pack(
+            "<HiiiidBBBBB",
+            self.current_level_num,
+            *player.rect.topleft,
+            self.level.origin,
+            player.vel_x,
+            player.vel_y,
+            player.on_ground,
+            player.alive,
+            player.finished_level,
+            self.game_over,
+            self.win,
+        )
+        crc = zlib.crc32(state)
+        enemies = self.enemies
+        for array in (
+            enemies.x,
+            enemies.y,
+            enemies.vel_x,
+            enemies.vel_y,
+            enemies.alive,
+        ):
+            crc = zlib.crc32(array.tobytes(), crc)
+        return zlib.crc32(self.level.tiles, crc)
+
+
+class RandomPolicy:
+    """Losowe sterowanie z przewagą biegu w prawo; akcje trzymane przez kilka klatek."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.controls = INPUT_RIGHT
+        self.hold = 0
+
+    def __call__(self, world):
+        if self.hold <= 0:
+            controls = INPUT_RIGHT if self.rng.random() < 0.8 else INPUT_LEFT
+            if self.rng.random() < 0.3:
+                controls |= INPUT_JUMP
+            if self.rng.random() < 0.5:
+                controls |= INPUT_SPRINT
+            self.controls = controls
+            self.hold = self.rng.randint(5, 30)
+        self.hold -= 1
+        return self.controls
+
+
+class ScriptedPolicy:
+    """Odtwarza w pętli listę kroków (liczba_klatek, maska_wejścia)."""
+
+    DEFAULT_SCRIPT = [(40, INPUT_RIGHT | INPUT_SPRINT), (20, INPUT_RIGHT | INPUT_JUMP)]
+
+    def __init__(self, script=None):
+        self.script = script or self.DEFAULT_SCRIPT
+        self.tick = 0
+        self.period = sum(ticks for ticks, _ in self.script)
+
+    def __call__(self, world):
+        t = self.tick % self.period
+        self.tick += 1
+        for ticks, controls in self.script:
+            if t < ticks:
+                return controls
+            t -= ticks
+        return 0
+
+
+class LevelPrefetcher:
+    """Generuje w tle poziomy, które mogą być potrzebne za chwilę.
+
+    Generowanie to czysty Python rzędu milisekundy, więc wystarcza jeden
+    wątek - proces kosztowałby więcej na starcie niż zyskał.
+    """
+
+    def __init__(self, level_length_screens=8):
+        self.level_length_screens = level_length_screens
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="level-prefetch"
+        )
+        self.pending = {}  # numer poziomu -> (seed, future)
 
-class Camera:
-    def __init__(self, width, height):
-        self.camera = pygame.Rect(0, 0, width, height)
-        self.width = width
-        self.height = height
+    def request(self, level_num):
+        if level_num in self.pending:
+            return
+        theme, difficulty = level_config(level_num)
+        seed = random.getrandbits(32)
+        future = self.executor.submit(
+            generate_level, seed, difficulty, self.level_length_screens, theme.name
+        )
+        self.pending[level_num] = (seed, future)
 
-    def apply(self, entity):
-        return entity.rect.move(self.camera.topleft)
+    def take(self, level_num):
+        """Zwraca (seed, LevelData) gotowego poziomu albo None, gdy worker nie zdążył."""
+        entry = self.pending.pop(level_num, None)
+        if entry is None:
+            return None
+        seed, future = entry
+        if not future.done():
+            future.cancel()
+            return None
+        return seed, LevelData.from_bytes(future.result())
 
-    def update(self, target):
-        x = -target.rect.centerx + int(SCREEN_WIDTH / 2)
-        y = -target.rect.centery + int(SCREEN_HEIGHT / 2)
-        x = min(0, x)
-        self.camera = pygame.Rect(x, 0, self.width, self.height)
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    PROFILE_REFRESH_FRAMES = 15  # Co tyle klatek odświeżamy tekst nakładki profilera
+    # Szerokości bufora wewnętrznego, po których schodzi tryb automatyczny
+    RENDER_WIDTHS = (
+        SCREEN_WIDTH,
+        SCREEN_WIDTH * 3 // 4,
+        SCREEN_WIDTH // 2,
+        SCREEN_WIDTH // 3,
+    )
+    AUTO_WINDOW = 60  # Klatki uśredniane przed decyzją o zmianie rozdzielczości
+    # Tyle kroków fizyki najwyżej na jedną klatkę; przy większym zaległym czasie
+    # gra zwalnia zamiast zapaść się w coraz dłuższe nadrabianie
+    MAX_STEPS_PER_FRAME = 5
+    # Powyżej tylu prostokątów zamazywanie każdego z osobna kosztuje więcej niż pełna klatka
+    DIRTY_RECT_LIMIT = 64
+    LOADING_BUDGET_MS = (
+        4  # Czas generowania pierwszego poziomu na klatkę ekranu ładowania
+    )
+
+    def __init__(
+        self,
+        streaming=False,
+        endless=False,
+        smart_enemies=False,
+        profile=False,
+        profile_out=None,
+        record_out=None,
+        dirty=False,
+        render_width=None,
+        scaler="nearest",
+        auto_resolution=False,
+        pack=None,
+        render_fps=FPS,
+        interpolate=False,
+        parallax=True,
+        fast_start=False,
+        startup_only=False,
+    ):
+        # Czas startu liczymy od konstruktora: init, pierwsza klatka, pierwsza klatka gry
+        self.started = time.perf_counter()
+        self.startup = {}
+        self.startup_only = startup_only
+
+        # Tylko potrzebne moduły - pygame.init() uruchamiałby też np. dźwięk
+        pygame.display.init()
+        pygame.font.init()
+        self.window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Super Pygame Bros - Advanced")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Arial", 48)
-        self.small_font = pygame.font.SysFont("Arial", 24)
 
-        self.level_gen = LevelGenerator(level_length_screens=8)
-        self.current_level_num = 1
+        self.world = World(
+            level_length_screens=8,
+            streaming=streaming,
+            endless=endless,
+            smart_enemies=smart_enemies,
+        )
+        self.chunk_layer = ChunkLayer()
+        # Poziomy z paczki wczytują się w milisekundę - generowanie w tle zbędne
+        self.pack = LevelPack(pack) if pack else None
+        self.pack_offset = 0  # Przesunięcie w paczce - N bierze kolejny jej poziom
+        self.prefetcher = None
+        if not self.world.streaming and self.pack is None:
+            self.prefetcher = LevelPrefetcher(8)
+        self.switch_ms = 0.0  # Czas ostatniej zmiany poziomu
+        self.switch_prefetched = False
+        self.switch_restarted = False
         self.running = True
 
-        self.start_new_game()
-
-    def start_new_game(self):
-        self.current_level_num = 1
-        self.load_level()
+        # Rysowanie przyrostowe: poprzednia klatka zostaje w buforze ekranu,
+        # przesuwamy ją o ruch kamery i odświeżamy tylko to, co się zmieniło
+        self.dirty = dirty
+        self.drawn_camera_x = None  # None = następna klatka rysowana w całości
+        self.dirty_rects = []  # Sprite'y i HUD poprzedniej klatki (do zamazania)
+        self.full_redraws = 0  # Klatki narysowane w całości (sprawdza bench.py)
+        # Warstwy paralaksy przesuwają się wolniej niż kafelki, więc przesunięta
+        # poprzednia klatka miałaby złe tło - rysowanie przyrostowe ma płaskie tło
+        self.parallax = parallax and not dirty
+
+        # Świat rysowany w buforze `screen` o obniżonej rozdzielczości i skalowany
+        # do okna; HUD trafia prosto do okna, więc tekst zostaje ostry
+        self.scaler = scaler
+        self.auto_resolution = auto_resolution
+        self.work_ms = collections.deque(maxlen=self.AUTO_WINDOW)
+        self._player_image = None  # (oryginał, pomniejszony obraz gracza)
+        self.set_render_width(render_width or SCREEN_WIDTH)
+
+        # Stały krok fizyki (1/FPS) niezależny od tempa rysowania; render_fps=0
+        # to rysowanie bez limitu, a interpolacja wygładza ruch między krokami
+        self.render_fps = render_fps
+        self.interpolate = interpolate
+        self.world.track_previous = interpolate
+
+        # Profiler klatki: F3 włącza nakładkę, F4 zapisuje zebrane czasy
+        self.profiler = FrameProfiler(enabled=profile)
+        self.profile_out = profile_out or "frames.csv"
+        self.profile_font = None  # Tworzona dopiero przy pierwszym włączeniu nakładki
+        self.fonts = {}  # (nazwa, rozmiar) -> Font tej gry, zob. get_font
+        self.hud = Hud()
+        self.counter_atlas = None  # Atlas cyfr liczników - po pierwszym użyciu fontu
+        self.profile_text = None
+        self.profile_age = 0
+
+        # Nagranie: seed każdego poziomu i maska wejścia każdego kroku
+        self.record_out = record_out
+        self.recording = None
+        if record_out:
+            self.recording = Recording(
+                8, streaming=streaming, endless=endless, smart_enemies=smart_enemies
+            )
 
-    def load_level(self):
-        # Konfiguracja poziomu w zależności od numeru
-        if self.current_level_num == 1:
-            theme = THEME_DAY
-            difficulty = 1
+        # Szybki start: pierwszy poziom generowany po kawałku między klatkami
+        # ekranu ładowania (poziom strumieniowy i z paczki są gotowe od razu)
+        self.loading = None
+        if fast_start and self.prefetcher is not None:
+            self.loading = self._build_first_level()
         else:
-            theme = THEME_NIGHT
-            difficulty = 2
+            self.start_new_game()
+        self.startup["init_ms"] = (time.perf_counter() - self.started) * 1000
+
+    def get_font(self, name, size):
+        """Font z pamięci tej gry - po pygame.quit() nowa gra tworzy własne.
+
+        name=None to domyślny font pygame, bez przeszukiwania fontów systemu.
+        """
+        font = self.fonts.get((name, size))
+        if font is None:
+            if name is None:
+                font = pygame.font.Font(None, size)
+            else:
+                font = system_font(name, size)
+            self.fonts[(name, size)] = font
+        return font
 
-        self.level_gen.set_theme(theme)
+    @property
+    def font(self):
+        return self.get_font("Arial", 48)
 
-        # Generowanie
-        self.tiles, self.enemies, self.flags, spawn_pos = self.level_gen.generate(
-            difficulty
+    @property
+    def small_font(self):
+        return self.get_font("Arial", 24)
+
+    def start_new_game(self):
+        self.world.current_level_num = 1
+        self.load_level()
+
+    def _build_first_level(self):
+        """Generator poziomu 1 (krok po kroku); wynik to para (seed, LevelData)."""
+        theme, difficulty = level_config(1)
+        seed = random.getrandbits(32)
+        generator = LevelGenerator(level_length_screens=8, seed=seed)
+        generator.set_theme(theme)
+        level = yield from generator.iter_generate(difficulty)
+        return seed, level
+
+    def continue_loading(self):
+        """Generuje pierwszy poziom przez LOADING_BUDGET_MS; gotowy od razu ładuje."""
+        deadline = time.perf_counter() + self.LOADING_BUDGET_MS / 1000
+        try:
+            while time.perf_counter() < deadline:
+                next(self.loading)
+        except StopIteration as done:
+            self.loading = None
+            self.world.current_level_num = 1
+            self.load_level(ready=done.value)
+
+    def draw_loading(self):
+        # Domyślny font pygame - bez przeszukiwania fontów systemu przed pierwszą klatką;
+        # napis renderowany raz, kolejne klatki ładowania to tylko blit z HUD-u
+        self.window.fill(BLACK)
+        self.hud.text(
+            "loading",
+            "Ładowanie...",
+            self.get_font(None, 48),
+            WHITE,
+            center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2),
+        )
+        self.hud.draw(self.window)
+        pygame.display.flip()
+        self.startup.setdefault(
+            "first_frame_ms", (time.perf_counter() - self.started) * 1000
         )
 
-        # Gracz
-        self.player = Player(spawn_pos[0], spawn_pos[1])
-        self.all_sprites = pygame.sprite.Group()
-        self.all_sprites.add(self.player)
+    def load_level(self, ready=None):
+        """Ładuje poziom current_level_num; `ready` to gotowa para (seed, LevelData)."""
+        start = time.perf_counter()
+        level_num = self.world.current_level_num
+
+        # Poziom z paczki albo z tła, a jeśli worker nie zdążył - generowanie synchroniczne
+        prefetched = False
+        if ready is None:
+            if self.pack is not None:
+                index = (level_num - 1 + self.pack_offset) % len(self.pack)
+                ready = (index, self.pack[index])
+            elif self.prefetcher:
+                ready = self.prefetcher.take(level_num)
+            prefetched = ready is not None
+        if ready is not None:
+            self.world.load_level(*ready)
+        else:
+            self.world.load_level()
+        self.chunk_layer.bake(self.world.level, self.world.theme)
+        self.drawn_camera_x = None
 
-        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
-        self.game_over = False
-        self.win = False
+        self.switch_ms = (time.perf_counter() - start) * 1000
+        self.switch_prefetched = prefetched
+        self.switch_restarted = False
+        if self.recording is not None:
+            self.recording.start_level(level_num, self.world.seed)
+
+        # Kolejny poziom (SPACJA) i nowy poziom o tym numerze (N) przygotowujemy od razu
+        if self.prefetcher:
+            self.prefetcher.request(level_num + 1)
+            self.prefetcher.request(level_num)
 
         # Wymuszamy czyszczenie eventów, żeby postać nie skoczyła sama po restarcie
         pygame.event.clear()
 
+    def restart_level(self):
+        """Ponowna próba bieżącego poziomu z migawki - bez generowania."""
+        start = time.perf_counter()
+        if self.world.restart_level():
+            self.chunk_layer.bake(self.world.level, self.world.theme)
+        self.drawn_camera_x = None
+
+        self.switch_ms = (time.perf_counter() - start) * 1000
+        self.switch_prefetched = False
+        self.switch_restarted = True
+        # W nagraniu restart to kolejny odcinek z tym samym seedem
+        if self.recording is not None:
+            self.recording.start_level(self.world.current_level_num, self.world.seed)
+        pygame.event.clear()
+
     def run(self):
+        profiler = self.profiler
+        step_ms = 1000 / FPS
+        lag = step_ms  # Pierwsza klatka od razu z jednym krokiem symulacji
         while self.running:
-            self.clock.tick(FPS)
+            # Ekran ładowania bez limitu klatek - każda klatka to kolejna porcja poziomu
+            lag += self.clock.tick(0 if self.loading else self.render_fps)
+            if self.loading is not None:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT or (
+                        event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+                    ):
+                        self.running = False
+                self.continue_loading()
+                if self.loading is not None:
+                    self.draw_loading()
+                lag = step_ms
+                continue
+            if self.auto_resolution:
+                self.adjust_resolution(self.clock.get_rawtime())
+            profiler.begin_frame()
             self.events()
-            if not self.game_over:
-                self.update()
-            self.draw()
+            profiler.mark("events")
+
+            # Tyle kroków, ile minęło czasu; przy zaległościach pomijamy klatki
+            steps = 0
+            while lag >= step_ms and steps < self.MAX_STEPS_PER_FRAME:
+                lag -= step_ms
+                steps += 1
+                if not self.world.game_over:
+                    controls = read_keyboard()
+                    if self.recording is not None:
+                        self.recording.record(controls)
+                    self.world.update(controls, mark=profiler.mark)
+            if lag >= step_ms:
+                lag %= step_ms
+
+            # Po końcu gry symulacja stoi - interpolacja ze starym `previous` drgałaby
+            if self.interpolate and not self.world.game_over:
+                self.draw(lag / step_ms)
+            else:
+                self.draw()
+            profiler.end_frame()
+            if "playable_ms" not in self.startup:
+                now = (time.perf_counter() - self.started) * 1000
+                self.startup.setdefault("first_frame_ms", now)
+                self.startup["playable_ms"] = now
+                if self.startup_only:
+                    self.running = False
+        if self.prefetcher:
+            self.prefetcher.shutdown()
+        if self.pack is not None:
+            self.pack.close()
+        if self.profiler.frames:
+            self.export_profile()
+        if self.recording is not None:
+            self.recording.finish(self.world.checksum())
+            self.recording.save(self.record_out)
+            print(f"recording: {self.recording.ticks} ticks -> {self.record_out}")
+
+    def run_replay(self, recording):
+        """Odtwarza nagranie w czasie rzeczywistym; zwraca sumę kontrolną końca.
+
+        ESC lub zamknięcie okna przerywają odtwarzanie (wynik: None).
+        """
+        world = self.world
+        profiler = self.profiler
+        for segment in recording.segments:
+            if world.enter_level(segment.level_num, segment.seed):
+                self.chunk_layer.bake(world.level, world.theme)
+            self.drawn_camera_x = None
+            for controls in segment.inputs:
+                self.clock.tick(FPS)
+                if self.auto_resolution:
+                    self.adjust_resolution(self.clock.get_rawtime())
+                profiler.begin_frame()
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT or (
+                        event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+                    ):
+                        return None
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                        profiler.toggle()
+                        self.profile_text = None
+                profiler.mark("events")
+                world.update(controls, mark=profiler.mark)
+                self.draw()
+                profiler.end_frame()
+        return world.checksum()
+
+    def export_profile(self):
+        count = self.profiler.export(self.profile_out)
+        print(f"profiler: {count} frames -> {self.profile_out}")
 
     def events(self):
         for event in pygame.event.get():
@@ -516,80 +1074,272 @@ class Game:
                 self.running = False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    # Reset gry od poziomu 1
-                    self.start_new_game()
+                    # Ponowna próba tego samego poziomu
+                    self.restart_level()
+                if event.key == pygame.K_n:
+                    # Nowy losowy poziom o tym samym numerze (z paczki - następny w niej)
+                    if self.pack is not None:
+                        self.pack_offset += 1
+                    self.load_level()
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                    self.profile_text = None
+                if event.key == pygame.K_F4 and self.profiler.frames:
+                    self.export_profile()
 
                 # Jeśli wygraliśmy i naciskamy spację -> następny poziom
-                if self.win and self.game_over:
+                if self.world.win and self.world.game_over:
                     if event.key == pygame.K_SPACE:
-                        self.current_level_num += 1
+                        self.world.current_level_num += 1
                         self.load_level()
 
-    def update(self):
-        # Aktualizacja wszystkich sprite'ów
-        self.all_sprites.update(self.tiles, self.enemies, self.flags)
-        self.enemies.update(self.tiles)
-        self.camera.update(self.player)
-
-        # Sprawdzenie czy gracz żyje
-        if not self.player.alive:
-            self.game_over = True
-            self.win = False
-
-        # Sprawdzenie czy gracz dotarł do flagi
-        if self.player.finished_level:
-            self.game_over = True
-            self.win = True
+    def set_render_width(self, width):
+        """Ustawia szerokość bufora wewnętrznego (wysokość wg proporcji ekranu)."""
+        if not 1 <= width <= SCREEN_WIDTH:
+            raise ValueError(
+                f"Szerokość bufora musi być z zakresu 1..{SCREEN_WIDTH}, jest {width}"
+            )
+        self.render_width = width
+        self.render_height = SCREEN_HEIGHT * width // SCREEN_WIDTH
+        self.chunk_layer.set_view_width(width)
+        self.drawn_camera_x = None
+        self.window.fill(BLACK)
+        if width == SCREEN_WIDTH:
+            self.screen = self.window
+            return
+        self.screen = pygame.Surface((width, self.render_height)).convert()
 
-    def draw(self):
-        # Tło zależne od motywu
-        self.screen.fill(self.level_gen.current_theme.bg_color)
+        # Docelowy prostokąt w oknie - w trybie całkowitym tylko wielokrotność bufora
+        if self.scaler == "integer":
+            factor = max(
+                1, min(SCREEN_WIDTH // width, SCREEN_HEIGHT // self.render_height)
+            )
+            size = (width * factor, self.render_height * factor)
+        else:
+            size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.output_rect = pygame.Rect((0, 0), size)
+        self.output_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.output = self.window.subsurface(self.output_rect)
+        out = self.output_rect
+        self.borders = [
+            rect
+            for rect in (
+                pygame.Rect(0, 0, SCREEN_WIDTH, out.top),
+                pygame.Rect(0, out.bottom, SCREEN_WIDTH, SCREEN_HEIGHT - out.bottom),
+                pygame.Rect(0, out.top, out.left, out.height),
+                pygame.Rect(out.right, out.top, SCREEN_WIDTH - out.right, out.height),
+            )
+            if rect.width and rect.height
+        ]
 
-        # Rysowanie grup
-        for sprite in self.tiles:
-            shifted = self.camera.apply(sprite)
-            if -TILE_SIZE < shifted.x < SCREEN_WIDTH + TILE_SIZE:
-                self.screen.blit(sprite.image, shifted)
+    def adjust_resolution(self, work_ms):
+        """Tryb automatyczny: zmienia rozdzielczość wewnętrzną wg czasu pracy klatki.
 
-        for sprite in self.flags:
-            shifted = self.camera.apply(sprite)
-            if -TILE_SIZE < shifted.x < SCREEN_WIDTH + TILE_SIZE:
-                self.screen.blit(sprite.image, shifted)
+        `work_ms` to czas klatki bez czekania na limit FPS. Średnia powyżej
+        90% budżetu obniża rozdzielczość o stopień, poniżej 40% podnosi ją z
+        powrotem (szeroka luka, żeby nie przełączać tam i z powrotem).
+        """
+        self.work_ms.append(work_ms)
+        if len(self.work_ms) < self.AUTO_WINDOW:
+            return
+        average = sum(self.work_ms) / len(self.work_ms)
+        budget = 1000 / FPS
+        # Pozycja na drabince; szerokość spoza niej liczy się jak najbliższa większa
+        step = sum(width >= self.render_width for width in self.RENDER_WIDTHS) - 1
+        if average > budget * 0.9 and step + 1 < len(self.RENDER_WIDTHS):
+            step += 1
+        elif average < budget * 0.4 and step > 0:
+            step -= 1
+        else:
+            return
+        self.work_ms.clear()
+        self.set_render_width(self.RENDER_WIDTHS[step])
+
+    def to_view(self, value):
+        """Piksele świata (ekranu natywnego) -> piksele bufora wewnętrznego."""
+        return value * self.render_width // SCREEN_WIDTH
+
+    def present(self):
+        """Skaluje bufor wewnętrzny do okna."""
+        if self.scaler == "smooth":
+            pygame.transform.smoothscale(
+                self.screen, self.output_rect.size, self.output
+            )
+        else:
+            pygame.transform.scale(self.screen, self.output_rect.size, self.output)
+        # W trybie całkowitym wokół obrazu zostaje ramka - czyścimy z niej ślady HUD
+        for rect in self.borders:
+            self.window.fill(BLACK, rect)
+
+    def draw(self, alpha=1.0):
+        """Rysuje klatkę; `alpha` < 1 to stan między poprzednim a bieżącym krokiem."""
+        world = self.world
+        mark = self.profiler.mark
+        scaled = self.screen is not self.window
+        enemies = world.enemies
+        player_x, player_y = world.player.rect.topleft
+        offset_x, offset_y = world.camera.camera.topleft
+        enemy_x = enemies.x
+        enemy_y = enemies.y
+        previous = world.previous
+        if alpha < 1.0 and previous is not None:
+            prev_x, prev_y, prev_offset, prev_ex, prev_ey = previous
+            player_x = round(prev_x + (player_x - prev_x) * alpha)
+            player_y = round(prev_y + (player_y - prev_y) * alpha)
+            offset_x = round(prev_offset + (offset_x - prev_offset) * alpha)
+            if len(prev_ex) == len(enemy_x):
+                enemy_x = (prev_ex + (enemy_x - prev_ex) * alpha).round().astype(int)
+                enemy_y = (prev_ey + (enemy_y - prev_ey) * alpha).round().astype(int)
+
+        # Ekran końca poziomu zasłania środek kadru - tam zawsze pełna klatka;
+        # przy obniżonej rozdzielczości i tak skalujemy cały bufor
+        full = (
+            not self.dirty
+            or scaled
+            or self.drawn_camera_x is None
+            or world.game_over
+            or len(self.dirty_rects) > self.DIRTY_RECT_LIMIT
+            or abs(offset_x - self.drawn_camera_x) >= SCREEN_WIDTH
+        )
+        if full:
+            self.full_redraws += 1
+            # Tło zależne od motywu
+            self.screen.fill(world.theme.bg_color)
+            if self.parallax:
+                draw_parallax(self.screen, world.theme, offset_x, self.render_width)
+
+            # Kafelki i flaga - gotowe pasy, stały koszt niezależnie od długości poziomu
+            self.chunk_layer.draw(self.screen, offset_x)
+            scrolled = True
+        else:
+            scrolled = self.scroll_background(offset_x - self.drawn_camera_x, offset_x)
+        mark("draw.tiles")
+
+        # Wrogowie: jedna wspólna tekstura, jedno wywołanie blits dla widocznych
+        image = enemy_texture(world.theme.enemy_color, self.to_view(TILE_SIZE))
+        visible = enemies.visible(-offset_x, SCREEN_WIDTH + TILE_SIZE - offset_x)
+        xs = enemy_x[visible] + offset_x
+        ys = enemy_y[visible] + offset_y
+        if scaled:
+            xs = self.to_view(xs)
+            ys = self.to_view(ys)
+        rects = self.screen.blits(
+            [(image, position) for position in zip(xs.tolist(), ys.tolist())],
+            doreturn=self.dirty,
+        )
 
-        for sprite in self.enemies:
-            shifted = self.camera.apply(sprite)
-            if -TILE_SIZE < shifted.x < SCREEN_WIDTH + TILE_SIZE:
-                self.screen.blit(sprite.image, shifted)
+        if world.player.alive:
+            player = world.player
+            rect = (player_x + offset_x, player_y + offset_y)
+            if scaled:
+                image = self.player_image(player)
+                rect = (self.to_view(rect[0]), self.to_view(rect[1]))
+            else:
+                image = player.image
+            rect = self.screen.blit(image, rect)
+            if self.dirty:
+                rects.append(rect)
+        mark("draw.entities")
 
-        if self.player.alive:
-            self.screen.blit(self.player.image, self.camera.apply(self.player))
+        if scaled:
+            self.present()
+            mark("draw.scale")
 
         # UI
-        self.draw_ui()
-        pygame.display.flip()
+        ui_rects = self.draw_ui()
+        if self.profiler.enabled:
+            ui_rects.extend(self.draw_profiler())
+        mark("draw.ui")
+
+        if not self.dirty or scaled:
+            pygame.display.flip()
+        else:
+            rects.extend(ui_rects)
+            if scrolled:
+                pygame.display.update()
+            else:
+                # Stoimy w miejscu: tylko stare i nowe miejsca sprite'ów oraz HUD
+                pygame.display.update(self.dirty_rects + rects)
+            self.dirty_rects = rects
+            self.drawn_camera_x = offset_x
+        mark("flip")
+
+    def player_image(self, player):
+        """Obraz gracza w rozdzielczości wewnętrznej (pamiętany do zmiany rozmiaru)."""
+        size = (self.to_view(player.rect.width), self.to_view(player.rect.height))
+        cached = self._player_image
+        if (
+            cached is None
+            or cached[0] is not player.image
+            or cached[1].get_size() != size
+        ):
+            cached = (player.image, pygame.transform.scale(player.image, size))
+            self._player_image = cached
+        return cached[1]
+
+    def scroll_background(self, dx, offset_x):
+        """Przesuwa poprzednią klatkę o `dx` i zamazuje to, co na niej nieaktualne.
+
+        Dorysowywany jest tylko odsłonięty pas przy krawędzi oraz tło pod
+        sprite'ami i HUD z poprzedniej klatki. Zwraca True, gdy obraz się przesunął.
+        """
+        screen = self.screen
+        if dx:
+            screen.scroll(dx, 0)
+            if dx < 0:
+                self.redraw_background(
+                    pygame.Rect(SCREEN_WIDTH + dx, 0, -dx, SCREEN_HEIGHT), offset_x
+                )
+            else:
+                self.redraw_background(pygame.Rect(0, 0, dx, SCREEN_HEIGHT), offset_x)
+        for rect in self.dirty_rects:
+            self.redraw_background(rect.move(dx, 0), offset_x)
+        return dx != 0
+
+    def redraw_background(self, rect, offset_x):
+        """Rysuje od nowa tło i kafelki w prostokącie ekranu."""
+        screen = self.screen
+        screen.set_clip(rect)
+        screen.fill(self.world.theme.bg_color, rect)
+        self.chunk_layer.draw(screen, offset_x)
+        screen.set_clip(None)
 
     def draw_ui(self):
-        if self.game_over:
-            if self.win:
-                msg1 = f"POZIOM {self.current_level_num} UKOŃCZONY!"
+        """Rysuje HUD albo ekran końca poziomu; zwraca zajęte prostokąty.
+
+        Napisy idą przez self.hud - font.render tylko przy zmianie treści.
+        """
+        hud = self.hud
+        if self.world.game_over:
+            if self.world.win:
+                msg1 = f"POZIOM {self.world.current_level_num} UKOŃCZONY!"
                 msg2 = "Naciśnij SPACJĘ aby grać dalej"
                 color = (255, 215, 0)
             else:
                 msg1 = "GAME OVER"
-                msg2 = "Naciśnij R aby zrestartować"
+                msg2 = "R - spróbuj ponownie | N - nowy poziom"
                 color = (255, 50, 50)
 
-            text1 = self.font.render(msg1, True, color)
-            text2 = self.small_font.render(msg2, True, WHITE)
+            rect1 = hud.text(
+                "title",
+                msg1,
+                self.font,
+                color,
+                center=(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 - 20),
+            )
+            rect2 = hud.text(
+                "subtitle",
+                msg2,
+                self.small_font,
+                WHITE,
+                center=(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 30),
+            )
 
             # Cień tekstu dla czytelności
-            rect1 = text1.get_rect(center=(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 - 20))
-            rect2 = text2.get_rect(center=(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 30))
-
-            pygame.draw.rect(
-                self.screen,
+            box = pygame.draw.rect(
+                self.window,
                 BLACK,
                 (
                     rect1.x - 10,
@@ -598,23 +1348,406 @@ class Game:
                     rect1.height + rect2.height + 60,
                 ),
             )
+            return [box] + hud.draw(self.window)
+
+        font = self.small_font
+        if self.counter_atlas is None:
+            self.counter_atlas = GlyphAtlas(font, WHITE)
+        hud.text(
+            "level",
+            f"Level: {self.world.current_level_num}",
+            font,
+            WHITE,
+            topleft=(20, 20),
+        )
+        hud.text(
+            "controls",
+            "WASD/Strzałki - Ruch | Shift - Sprint | R - Restart | N - Nowy poziom",
+            font,
+            WHITE,
+            topleft=(20, 50),
+        )
+        hud.text(
+            "switch",
+            f"Zmiana poziomu: {self.switch_ms:.1f} ms"
+            + (
+                " (restart)"
+                if self.switch_restarted
+                else (
+                    " (z paczki)"
+                    if self.pack is not None
+                    else " (z tła)" if self.switch_prefetched else ""
+                )
+            ),
+            font,
+            WHITE,
+            topleft=(20, 80),
+        )
 
-            self.screen.blit(text1, rect1)
-            self.screen.blit(text2, rect2)
+        # Liczniki zmieniają się prawie co klatkę - cyfry z atlasu
+        label = hud.text("time.label", "Czas: ", font, WHITE, topleft=(20, 110))
+        hud.counter(
+            "time",
+            f"{self.world.ticks / FPS:.1f}",
+            self.counter_atlas,
+            topleft=label.topright,
+        )
+        label = hud.text("fps.label", "FPS: ", font, WHITE, topleft=(200, 110))
+        hud.counter(
+            "fps",
+            f"{self.clock.get_fps():.0f}",
+            self.counter_atlas,
+            topleft=label.topright,
+        )
+        return hud.draw(self.window)
+
+    def draw_profiler(self):
+        """Nakładka profilera: średnie i p99 sekcji oraz wykres czasu klatki.
+
+        Zwraca zajęte prostokąty ekranu.
+        """
+        profiler = self.profiler
+        if self.profile_font is None:
+            self.profile_font = self.get_font("Consolas,Courier New,monospace", 18)
+
+        # Tekst renderujemy co kilka klatek - inaczej nakładka mierzyłaby głównie siebie
+        self.profile_age -= 1
+        if self.profile_text is None or self.profile_age <= 0:
+            self.profile_age = self.PROFILE_REFRESH_FRAMES
+            stats = profiler.stats()
+            lines = [f"{'sekcja':16}{'śr. ms':>9}{'p99 ms':>9}"]
+            lines.extend(
+                f"{name:16}{stats[name][0]:9.2f}{stats[name][1]:9.2f}"
+                for name in COLUMNS
+                if name in stats
+            )
+            lines.append("F3 - ukryj | F4 - zapisz " + self.profile_out)
+            height = self.profile_font.get_linesize()
+            text = pygame.Surface((360, height * len(lines) + 10))
+            text.fill(BLACK)
+            for i, line in enumerate(lines):
+                text.blit(
+                    self.profile_font.render(line, True, WHITE), (5, 5 + i * height)
+                )
+            self.profile_text = text
+
+        x = SCREEN_WIDTH - self.profile_text.get_width() - 20
+        text_rect = self.window.blit(self.profile_text, (x, 20))
+
+        # Wykres: jedna kolumna na klatkę, pozioma linia na budżecie 1/FPS
+        frames = profiler.recent()
+        graph = pygame.Rect(x, 30 + self.profile_text.get_height(), 360, 120)
+        pygame.draw.rect(self.window, BLACK, graph)
+        scale = graph.height / (3000 / FPS)  # Pełna wysokość = trzy budżety klatki
+        budget_y = graph.bottom - int(1000 / FPS * scale)
+        pygame.draw.line(
+            self.window,
+            (255, 215, 0),
+            (graph.left, budget_y),
+            (graph.right - 1, budget_y),
+        )
+        if len(frames) > 1:
+            column = COLUMNS.index(FRAME)
+            step = (graph.width - 1) / (profiler.window - 1)
+            points = [
+                (
+                    graph.left + int(i * step),
+                    graph.bottom
+                    - 1
+                    - min(graph.height - 1, int(frame[column] * scale)),
+                )
+                for i, frame in enumerate(frames)
+            ]
+            pygame.draw.lines(self.window, (50, 220, 50), False, points)
+        return [text_rect, graph]
+
+
+def run_headless(
+    levels,
+    ticks,
+    policy_name="random",
+    seed=None,
+    streaming=False,
+    endless=False,
+    smart_enemies=False,
+):
+    """Symuluje poziomy bez rysowania i limitu FPS; zwraca statystyki przebiegu."""
+    # Bez okna: sterownik "dummy" pozwala tworzyć powierzchnie sprite'ów
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    random.seed(seed)
+    if policy_name == "random":
+        policy = RandomPolicy(seed)
+    else:
+        policy = ScriptedPolicy()
+
+    world = World(
+        level_length_screens=8,
+        streaming=streaming,
+        endless=endless,
+        smart_enemies=smart_enemies,
+    )
+    results = []
+    total_ticks = 0
+    total_time = 0.0
+    for level_num in range(1, levels + 1):
+        world.current_level_num = level_num
+        world.load_level()
+        deaths = wins = 0
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            world.update(policy(world))
+            if world.game_over:
+                if world.win:
+                    wins += 1
+                else:
+                    deaths += 1
+                world.load_level()
+        elapsed = time.perf_counter() - start
+
+        total_ticks += ticks
+        total_time += elapsed
+        results.append(
+            {
+                "level": level_num,
+                "ticks": ticks,
+                "seconds": elapsed,
+                "ticks_per_second": ticks / elapsed if elapsed else 0.0,
+                "deaths": deaths,
+                "wins": wins,
+            }
+        )
 
+    return {
+        "levels": results,
+        "ticks": total_ticks,
+        "seconds": total_time,
+        "ticks_per_second": total_ticks / total_time if total_time else 0.0,
+    }
+
+
+def run_replay_headless(recording):
+    """Odtwarza nagranie bez okna i limitu FPS; zwraca statystyki i sumę kontrolną."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    world = World(
+        level_length_screens=recording.level_length_screens,
+        streaming=recording.streaming,
+        endless=recording.endless,
+        smart_enemies=recording.smart_enemies,
+    )
+    ticks = 0
+    elapsed = 0.0
+    for segment in recording.segments:
+        world.enter_level(segment.level_num, segment.seed)
+        update = world.update
+        start = time.perf_counter()
+        for controls in segment.inputs:
+            update(controls)
+        elapsed += time.perf_counter() - start
+        ticks += len(segment.inputs)
+
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed else 0.0,
+        "checksum": world.checksum(),
+    }
+
+
+def _report_replay(recording, checksum):
+    if checksum == recording.checksum:
+        print(f"checksum OK ({checksum:08x})")
+        return 0
+    print(f"CHECKSUM MISMATCH: recorded {recording.checksum:08x}, got {checksum:08x}")
+    return 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Super Pygame Bros")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="symulacja bez okna i bez limitu FPS (testy obciążeniowe, dane treningowe)",
+    )
+    parser.add_argument("--levels", type=int, default=1, help="liczba poziomów")
+    parser.add_argument("--ticks", type=int, default=10000, help="klatki na poziom")
+    parser.add_argument("--policy", choices=["random", "scripted"], default="random")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="generuj poziom na bieżąco przed kamerą i usuwaj go za graczem",
+    )
+    parser.add_argument(
+        "--endless",
+        action="store_true",
+        help="nieskończony poziom (implikuje --stream)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="włącz profiler klatki od startu (w grze przełącza go F3)",
+    )
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        help="plik na czasy klatek (.csv albo .json), zapisywany F4 i przy wyjściu",
+    )
+    parser.add_argument(
+        "--dirty",
+        action="store_true",
+        help="rysuj przyrostowo: przesuwaj poprzednią klatkę i odświeżaj tylko "
+        "zmiany; tło bez paralaksy (jednolity kolor)",
+    )
+    parser.add_argument(
+        "--render-width",
+        type=int,
+        default=None,
+        help="szerokość bufora wewnętrznego, np. 960 lub 640 (skalowany do okna)",
+    )
+    parser.add_argument(
+        "--scaler",
+        choices=["nearest", "smooth", "integer"],
+        default="nearest",
+        help="skalowanie bufora do okna",
+    )
+    parser.add_argument(
+        "--auto-resolution",
+        action="store_true",
+        help="obniżaj rozdzielczość wewnętrzną, gdy klatka przekracza budżet",
+    )
+    parser.add_argument(
+        "--record", default=None, help="nagraj seedy poziomów i wejście do pliku"
+    )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        help="odtwórz nagranie i sprawdź sumę kontrolną (z --headless bez limitu FPS)",
+    )
+    parser.add_argument(
+        "--render-fps",
+        type=int,
+        default=FPS,
+        help=f"limit klatek rysowania, 0 = bez limitu (fizyka zawsze {FPS} kroków/s)",
+    )
+    parser.add_argument(
+        "--interpolate",
+        action="store_true",
+        help="rysuj pozycje interpolowane między krokami fizyki",
+    )
+    parser.add_argument(
+        "--pack",
+        default=None,
+        help="graj poziomami z paczki (levelpack.py) zamiast z generatora",
+    )
+    parser.add_argument(
+        "--no-parallax",
+        dest="parallax",
+        action="store_false",
+        help="jednolite tło zamiast warstw paralaksy",
+    )
+    parser.add_argument(
+        "--smart-enemies",
+        action="store_true",
+        help="wrogowie omijają przepaście i gonią gracza po grafie nawigacji poziomu",
+    )
+    parser.add_argument(
+        "--startup-time",
+        action="store_true",
+        help="zmierz czas do pierwszej klatki i do pierwszej klatki gry, potem wyjdź",
+    )
+    args = parser.parse_args(argv)
+    if args.pack and (args.stream or args.endless):
+        parser.error("--pack nie działa z poziomem strumieniowym")
+    if args.pack and args.record:
+        parser.error("nagrania zapisują seedy generatora - nie działają z --pack")
+    if args.smart_enemies and (args.stream or args.endless):
+        parser.error("--smart-enemies wymaga poziomu bez strumieniowania")
+    if args.render_width is not None and not 1 <= args.render_width <= SCREEN_WIDTH:
+        parser.error(f"--render-width musi być z zakresu 1..{SCREEN_WIDTH}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.replay:
+        recording = Recording.load(args.replay)
+        if args.headless:
+            stats = run_replay_headless(recording)
+            print(
+                f"replay: {stats['ticks']} ticks in {stats['seconds']:.2f}s "
+                f"({stats['ticks_per_second']:.0f} ticks/s)"
+            )
+            checksum = stats["checksum"]
         else:
-            lvl_text = self.small_font.render(
-                f"Level: {self.current_level_num}", True, WHITE
+            game = Game(
+                streaming=recording.streaming,
+                endless=recording.endless,
+                smart_enemies=recording.smart_enemies,
+                profile=args.profile,
+                profile_out=args.profile_out,
+                dirty=args.dirty,
+                render_width=args.render_width,
+                scaler=args.scaler,
+                auto_resolution=args.auto_resolution,
+                parallax=args.parallax,
+                fast_start=True,  # Poziomy i tak ładuje nagranie
             )
-            controls_text = self.small_font.render(
-                "WASD/Strzałki - Ruch | Shift - Sprint | R - Reset", True, WHITE
+            checksum = game.run_replay(recording)
+            if game.prefetcher:
+                game.prefetcher.shutdown()
+        pygame.quit()
+        if checksum is None:
+            print("replay interrupted")
+            return 0
+        return _report_replay(recording, checksum)
+
+    if args.headless:
+        stats = run_headless(
+            args.levels,
+            args.ticks,
+            args.policy,
+            args.seed,
+            args.stream,
+            args.endless,
+            args.smart_enemies,
+        )
+        for level in stats["levels"]:
+            print(
+                f"level {level['level']}: {level['ticks']} ticks in "
+                f"{level['seconds']:.2f}s ({level['ticks_per_second']:.0f} ticks/s, "
+                f"deaths={level['deaths']}, wins={level['wins']})"
             )
-            self.screen.blit(lvl_text, (20, 20))
-            self.screen.blit(controls_text, (20, 50))
+        print(f"total: {stats['ticks_per_second']:.0f} ticks/s")
+        pygame.quit()
+        return 0
+
+    game = Game(
+        streaming=args.stream,
+        endless=args.endless,
+        smart_enemies=args.smart_enemies,
+        profile=args.profile,
+        profile_out=args.profile_out,
+        record_out=args.record,
+        dirty=args.dirty,
+        render_width=args.render_width,
+        scaler=args.scaler,
+        auto_resolution=args.auto_resolution,
+        pack=args.pack,
+        render_fps=args.render_fps,
+        interpolate=args.interpolate,
+        parallax=args.parallax,
+        fast_start=True,
+        startup_only=args.startup_time,
+    )
+    game.run()
+    pygame.quit()
+    if args.startup_time:
+        print(", ".join(f"{name} {value:.1f}" for name, value in game.startup.items()))
+    return 0
 
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
-    pygame.quit()
-    sys.exit()
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Graf nawigacji wrogów budowany raz na poziom - bez zależności od pygame.
+
+Powierzchnia to ciągły rząd wolnych pól z blokiem stałym pod spodem, czyli
+to, po czym wróg może chodzić. Przejścia między powierzchniami (zejście z
+krawędzi, skok z ENEMY_JUMP_POWER) wyznaczają loty liczone tą samą funkcją
+co EnemySwarm.update (physics.enemy_step), wszystkie naraz w tablicach
+NumPy - graf zgadza się więc z ruchem wrogów w grze. Lot, który zahacza o
+ścianę albo sufit, się nie liczy: wróg by się od nich odbił.
+
+Zapytania w trakcie gry są tanie: powierzchnia pod polem to odczyt z
+tablicy, a pierwszy krok trasy między dwiema powierzchniami liczy BFS raz
+i pamięta, dopóki graf (czyli poziom) się nie zmieni.
+"""
+
+import numpy as np
+
+from level import SOLID
+from physics import ENEMY_FALL_LIMIT, enemy_step, solid_grid
+from settings import *
+
+LINK_DROP = 0
+LINK_JUMP = 1
+
+MAX_FLIGHT_FRAMES = 120
+WALK_OFF_FRAMES = TILE_SIZE // ENEMY_SPEED + 2
+# Wysokość skoku w wierszach i zasięg lotu w kolumnach - z samych stałych fizyki
+JUMP_RISE_ROWS = int(ENEMY_JUMP_POWER**2 / (2 * GRAVITY)) // TILE_SIZE
+JUMP_REACH_COLS = ENEMY_SPEED * int(-2 * ENEMY_JUMP_POWER / GRAVITY) // TILE_SIZE + 1
+TAKEOFF_TRIES = 6  # Punkty odbicia co pół kafelka, sprawdzane dla każdego celu skoku
+
+
+class NavGraph:
+    """Powierzchnie poziomu i przejścia między nimi.
+
+    Przejście to krotka (rodzaj, kierunek, x odbicia, docelowa powierzchnia):
+    wróg idzie do x odbicia, a potem rusza w `kierunku` - skacze (LINK_JUMP)
+    albo po prostu schodzi z krawędzi (LINK_DROP).
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.origin = level.origin
+        # Siatka do lotów ta sama co w EnemySwarm; bez ramki do szukania powierzchni
+        self._solid = solid_grid(level)
+        solid = self._solid[1:-1, 1:-1]
+
+        standing = np.zeros_like(solid)
+        standing[:, :-1] = ~solid[:, :-1] & solid[:, 1:]
+        # Powierzchnie jako (wiersz, pierwsza kolumna, ostatnia kolumna)
+        self.surfaces = []
+        self.grid = np.full(solid.shape, -1, dtype=np.int32)
+        for row in range(level.height):
+            edges = np.diff(standing[:, row].astype(np.int8), prepend=0, append=0)
+            for start, stop in zip(
+                np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            ):
+                self.grid[start:stop, row] = len(self.surfaces)
+                self.surfaces.append(
+                    (row, int(start) + self.origin, int(stop) - 1 + self.origin)
+                )
+
+        self.left_x = np.array(
+            [start * TILE_SIZE for _, start, _ in self.surfaces], dtype=np.int64
+        )
+        self.right_x = np.array(
+            [(end + 1) * TILE_SIZE - ENEMY_SIZE for _, _, end in self.surfaces],
+            dtype=np.int64,
+        )
+        self.links = [[] for _ in self.surfaces]
+        self._add_drops()
+        self._add_jumps()
+        self._routes = {}
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    # --- Zapytania ---
+    def surface_at(self, cols, rows):
+        """Numery powierzchni pod polami (tablice NumPy); -1 poza powierzchnią."""
+        cols = cols - self.origin
+        inside = (
+            (cols >= 0)
+            & (cols < self.grid.shape[0])
+            & (rows >= 0)
+            & (rows < self.grid.shape[1])
+        )
+        found = np.full(len(cols), -1, dtype=np.int32)
+        found[inside] = self.grid[cols[inside], rows[inside]]
+        return found
+
+    def surface_under(self, x, bottom, w):
+        """Powierzchnia pod ciałem szerokości `w` od x, ze stopami na `bottom`."""
+        row = (bottom - 1) // TILE_SIZE
+        for col in range(x // TILE_SIZE, (x + w - 1) // TILE_SIZE + 1):
+            col -= self.origin
+            if 0 <= col < self.grid.shape[0] and 0 <= row < self.grid.shape[1]:
+                index = int(self.grid[col, row])
+                if index >= 0:
+                    return index
+        return None
+
+    def route(self, src, dst):
+        """Pierwsze przejście na najkrótszej trasie src -> dst albo None.
+
+        BFS z src wypełnia pamięć od razu dla wszystkich osiągalnych celów.
+        """
+        key = (src, dst)
+        if key not in self._routes:
+            first = {src: None}
+            queue = [src]
+            for surface in queue:
+                for link in self.links[surface]:
+                    target = link[3]
+                    if target not in first:
+                        first[target] = first[surface] or link
+                        queue.append(target)
+            for target, link in first.items():
+                self._routes[(src, target)] = link
+            self._routes.setdefault(key, None)
+        return self._routes[key]
+
+    # --- Budowa ---
+    def _add_drops(self):
+        # Zejście z każdej krawędzi bez ściany: lądowanie to przejście, brak - przepaść
+        count = len(self.surfaces)
+        self.left_safe = np.ones(count, dtype=bool)
+        self.right_safe = np.ones(count, dtype=bool)
+        flights = []
+        tile_at = self.level.tile_at
+        for index, (row, start, end) in enumerate(self.surfaces):
+            if not SOLID[tile_at(start - 1, row)]:
+                flights.append((index, start * TILE_SIZE, row, -1))
+            if not SOLID[tile_at(end + 1, row)]:
+                flights.append((index, int(self.right_x[index]), row, 1))
+
+        landings = self._fly([flight[1:] for flight in flights], 0.0)
+        for (index, x, _, direction), target in zip(flights, landings):
+            if target is None:
+                safe = self.left_safe if direction < 0 else self.right_safe
+                safe[index] = False
+            else:
+                self.links[index].append((LINK_DROP, direction, x, target))
+
+    def _add_jumps(self):
+        # Kandydaci: cele w zasięgu, punkty odbicia co pół kafelka od bliższej
+        # krawędzi celu. Wiele celów dzieli punkty odbicia - każdy lot liczymy raz.
+        candidates = []
+        takeoffs = {}
+        for index, (row, start, end) in enumerate(self.surfaces):
+            reached = {link[3] for link in self.links[index]}
+            lowest = int(self.left_x[index])
+            highest = int(self.right_x[index])
+            for target, (target_row, target_start, target_end) in enumerate(
+                self.surfaces
+            ):
+                if target == index or target in reached:
+                    continue
+                if target_row < row - JUMP_RISE_ROWS:
+                    continue
+                for direction in (1, -1):
+                    if direction > 0:
+                        if target_end <= start or target_start > end + JUMP_REACH_COLS:
+                            continue
+                        near = min(target_start * TILE_SIZE - ENEMY_SIZE, highest)
+                    else:
+                        if target_start >= end or target_end < start - JUMP_REACH_COLS:
+                            continue
+                        near = max((target_end + 1) * TILE_SIZE, lowest)
+                    xs = []
+                    for attempt in range(TAKEOFF_TRIES):
+                        x = near - direction * attempt * (TILE_SIZE // 2)
+                        if not lowest <= x <= highest:
+                            break
+                        xs.append(x)
+                        takeoffs.setdefault((x, row, direction), len(takeoffs))
+                    candidates.append((index, target, row, direction, xs))
+
+        landings = self._fly(list(takeoffs), ENEMY_JUMP_POWER)
+        linked = set()
+        for index, target, row, direction, xs in candidates:
+            if (index, target) in linked:
+                continue
+            for x in xs:
+                if landings[takeoffs[(x, row, direction)]] == target:
+                    self.links[index].append((LINK_JUMP, direction, x, target))
+                    linked.add((index, target))
+                    break
+
+    def _fly(self, starts, vel_y):
+        """Loty z (x, wiersz, kierunek) naraz; lista powierzchni lądowania albo None."""
+        if not starts:
+            return []
+        x = np.array([start[0] for start in starts], dtype=np.int64)
+        y = np.array([start[1] for start in starts], dtype=np.int64) * TILE_SIZE
+        vel_x = np.array([start[2] for start in starts], dtype=np.int64) * ENEMY_SPEED
+        vel_y = np.full(len(starts), vel_y, dtype=np.float64)
+        airborne = vel_y < 0
+        flying = np.ones(len(starts), dtype=bool)
+        landed = np.zeros(len(starts), dtype=bool)
+
+        for frame in range(MAX_FLIGHT_FRAMES):
+            live = np.flatnonzero(flying)
+            if len(live) == 0:
+                break
+            lx, ly, _, vy, wall, down, bumped = enemy_step(
+                self._solid, self.origin, x[live], y[live], vel_x[live], vel_y[live]
+            )
+
+            # Ściana albo sufit - wróg zawróciłby w locie; zejście, które po
+            # WALK_OFF_FRAMES wciąż nie oderwało się od ziemi, też się nie liczy
+            failed = wall | bumped | (ly > ENEMY_FALL_LIMIT)
+            if frame >= WALK_OFF_FRAMES:
+                failed |= ~airborne[live] & down
+            done = down & airborne[live]
+            x[live] = lx
+            y[live] = ly
+            vel_y[live] = vy
+            airborne[live] |= ~down
+            landed[live[done & ~failed]] = True
+            flying[live[done | failed]] = False
+
+        return [
+            self.surface_under(x, y + ENEMY_SIZE, ENEMY_SIZE) if ok else None
+            for x, y, ok in zip(x.tolist(), y.tolist(), landed.tolist())
+        ]
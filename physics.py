@@ -0,0 +1,157 @@
+"""Ruch i kolizje ciał z siatką poziomu - bez zależności od pygame.
+
+Te same funkcje napędzają gracza w grze i analizator przechodniości
+poziomów, więc analiza korzysta dokładnie z fizyki rozgrywki. Podobnie
+enemy_step krokuje wrogów w grze (EnemySwarm) i loty w grafie nawigacji
+(NavGraph) - graf nie może rozjechać się z ruchem wrogów.
+"""
+
+import numpy as np
+
+from level import SOLID
+from settings import *
+
+ENEMY_FALL_LIMIT = SCREEN_HEIGHT + 200  # Wróg poniżej tej wysokości spadł w przepaść
+_SOLID_LOOKUP = np.frombuffer(SOLID, dtype=np.uint8).astype(bool)
+
+
+def round_coord(value):
+    """Zaokrągla jak pygame.Rect przy przypisaniu floata (połówki od zera)."""
+    if value >= 0:
+        return int(value + 0.5)
+    return -int(-value + 0.5)
+
+
+def move_body(level, x, y, w, h, vel_x, vel_y):
+    """Przesuwa prostokąt najpierw w X, potem w Y, rozwiązując kolizje z blokami.
+
+    Każda oś jest przemiatana: sprawdzany jest cały pas, przez który przesuwa
+    się przednia krawędź, i ciało zatrzymuje się na pierwszym bloku w kierunku
+    ruchu - przy dowolnej prędkości nie da się przeniknąć przez kafelek.
+
+    Zwraca (x, y, vel_y, on_ground).
+    """
+    # Ruch X
+    new_x = round_coord(x + vel_x)
+    if new_x > x:
+        hits = level.solid_cells(x + w, y, new_x - x, h)
+        if hits:
+            new_x = min(col for col, _ in hits) * TILE_SIZE - w
+    elif new_x < x:
+        hits = level.solid_cells(new_x, y, x - new_x, h)
+        if hits:
+            new_x = (max(col for col, _ in hits) + 1) * TILE_SIZE
+    x = new_x
+
+    # Ruch Y
+    new_y = round_coord(y + vel_y)
+    on_ground = False
+    if new_y > y:
+        hits = level.solid_cells(x, y + h, w, new_y - y)
+        if hits:
+            new_y = min(row for _, row in hits) * TILE_SIZE - h
+            vel_y = 0
+            on_ground = True
+    elif new_y < y:
+        hits = level.solid_cells(x, new_y, w, y - new_y)
+        if hits:
+            new_y = (max(row for _, row in hits) + 1) * TILE_SIZE
+            vel_y = 0
+    return x, new_y, vel_y, on_ground
+
+
+def player_velocity(controls, vel_y, on_ground):
+    """Prędkości gracza po sterowaniu i grawitacji: zwraca (vel_x, vel_y)."""
+    current_speed = SPRINT_SPEED if controls & INPUT_SPRINT else WALK_SPEED
+    vel_x = 0
+    if controls & INPUT_LEFT:
+        vel_x = -current_speed
+    if controls & INPUT_RIGHT:
+        vel_x = current_speed
+
+    if controls & INPUT_JUMP and on_ground:
+        vel_y = JUMP_POWER
+
+    vel_y += GRAVITY
+    if vel_y > TERMINAL_VELOCITY:
+        vel_y = TERMINAL_VELOCITY
+    return vel_x, vel_y
+
+
+# --- Wrogowie: wszystkie ciała naraz w tablicach NumPy ---
+def solid_grid(level):
+    """Siatka poziomu jako tablica bool [kolumna, wiersz] z ramką jednej komórki.
+
+    Wiersze poza poziomem są puste, kolumna po lewej to usunięta część
+    strumienia. Pole (col, row) leży pod [col - level.origin + 1, row + 1].
+    """
+    tiles = np.frombuffer(bytes(level.tiles), dtype=np.uint8)
+    solid = np.zeros((level.width - level.origin + 2, level.height + 2), bool)
+    solid[1:-1, 1:-1] = _SOLID_LOOKUP[tiles].reshape(-1, level.height)
+    solid[0, 1:-1] = level.origin > 0 and SOLID[level.evicted_type]
+    return solid
+
+
+def _solid_at(solid, origin, cols, rows):
+    cols = np.clip(cols - origin + 1, 0, solid.shape[0] - 1)
+    rows = np.clip(rows + 1, 0, solid.shape[1] - 1)
+    return solid[cols, rows]
+
+
+def first_hit(solid, origin, x, y):
+    """Pierwszy blok stały pod ciałem wroga w kolejności jak w solid_cells.
+
+    Wróg ma rozmiar kafelka, więc nachodzi na co najwyżej 2x2 komórki.
+    Zwraca (trafienie, kolumna, wiersz) dla każdego ciała.
+    """
+    c0 = x // TILE_SIZE
+    c1 = (x + ENEMY_SIZE - 1) // TILE_SIZE
+    r0 = y // TILE_SIZE
+    r1 = (y + ENEMY_SIZE - 1) // TILE_SIZE
+    h00, h01, h10, h11 = _solid_at(
+        solid,
+        origin,
+        np.concatenate([c0, c0, c1, c1]),
+        np.concatenate([r0, r1, r0, r1]),
+    ).reshape(4, -1)
+
+    hit = h00 | h01 | h10 | h11
+    in_c0 = h00 | h01
+    col = np.where(in_c0, c0, c1)
+    row = np.where(in_c0, np.where(h00, r0, r1), np.where(h10, r0, r1))
+    return hit, col, row
+
+
+def enemy_step(solid, origin, x, y, vel_x, vel_y):
+    """Jeden krok ciał wrogów na siatce z solid_grid.
+
+    Grawitacja, ruch X z zawracaniem na ścianie, potem ruch Y z lądowaniem
+    i odbiciem od sufitu. Zwraca (x, y, vel_x, vel_y, ściana, lądowanie, sufit);
+    flagi mówią, co zatrzymało ciało w tym kroku.
+    """
+    vel_y = vel_y + GRAVITY
+
+    # Ruch X i zawracanie na ścianie
+    x = x + vel_x
+    wall, col, _ = first_hit(solid, origin, x, y)
+    moving_right = vel_x > 0
+    bounce_right = wall & moving_right
+    bounce_left = wall & ~moving_right
+    x = np.where(bounce_right, col * TILE_SIZE - ENEMY_SIZE, x)
+    x = np.where(bounce_left, (col + 1) * TILE_SIZE, x)
+    vel_x = np.where(bounce_right, -ENEMY_SPEED, vel_x)
+    vel_x = np.where(bounce_left, ENEMY_SPEED, vel_x)
+
+    # Ruch Y (zaokrąglanie jak round_coord) i lądowanie
+    target = y + vel_y
+    y = np.where(target >= 0, np.floor(target + 0.5), -np.floor(-target + 0.5)).astype(
+        np.int64
+    )
+    hit, _, row = first_hit(solid, origin, x, y)
+    landed = hit & (vel_y > 0)
+    y = np.where(landed, row * TILE_SIZE - ENEMY_SIZE, y)
+    # Sufit (tylko w skoku sprytnych wrogów): zostają pod blokiem i spadają
+    bumped = hit & (vel_y < 0)
+    y = np.where(bumped, (y // TILE_SIZE + 1) * TILE_SIZE, y)
+    vel_y = np.where(landed | bumped, 0.0, vel_y)
+    return x, y, vel_x, vel_y, wall, landed, bumped
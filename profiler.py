@@ -0,0 +1,113 @@
+"""Pomiar czasu sekcji klatki - bez zależności od pygame.
+
+Pętla gry woła mark(nazwa) po każdej sekcji; mierzony jest czas od
+poprzedniego znacznika. Wyłączony profiler podmienia begin_frame/mark/
+end_frame na pustą funkcję, więc w grze zostaje tylko koszt wywołania.
+"""
+
+import collections
+import csv
+import json
+import time
+
+SECTIONS = (
+    "events",
+    "update.player",
+    "update.enemies",
+    "update.world",
+    "draw.tiles",
+    "draw.entities",
+    "draw.scale",
+    "draw.ui",
+    "flip",
+)
+FRAME = "frame"  # Pełny odstęp między początkami klatek (z czekaniem na FPS)
+COLUMNS = SECTIONS + (FRAME,)
+
+_INDEX = {name: i for i, name in enumerate(SECTIONS)}
+
+
+def _noop(*args):
+    pass
+
+
+class FrameProfiler:
+    def __init__(self, window=240, history=36000, enabled=False):
+        self.window = window  # Tyle ostatnich klatek liczy się do średnich i wykresu
+        self.frames = collections.deque(
+            maxlen=history
+        )  # Krotki ms w kolejności COLUMNS
+        self._current = [0.0] * len(SECTIONS)
+        self._frame_start = None
+        self._last = 0.0
+        self.enabled = enabled
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = value
+        if value:
+            self.begin_frame = self._begin_frame
+            self.mark = self._mark
+            self.end_frame = self._end_frame
+        else:
+            self.begin_frame = self.mark = self.end_frame = _noop
+            self._frame_start = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    # --- Pomiar ---
+    def _begin_frame(self):
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frames.append(
+                tuple(self._current) + ((now - self._frame_start) * 1000,)
+            )
+        self._frame_start = now
+        self._last = now
+        self._current = [0.0] * len(SECTIONS)
+
+    def _mark(self, name):
+        now = time.perf_counter()
+        self._current[_INDEX[name]] += (now - self._last) * 1000
+        self._last = now
+
+    def _end_frame(self):
+        # Klatka trafia do historii na początku następnej, gdy znamy jej pełny czas
+        self._last = time.perf_counter()
+
+    # --- Statystyki ---
+    def recent(self):
+        count = min(self.window, len(self.frames))
+        return [
+            self.frames[i] for i in range(len(self.frames) - count, len(self.frames))
+        ]
+
+    def stats(self):
+        """{kolumna: (średnia_ms, p99_ms)} z ostatnich `window` klatek."""
+        frames = self.recent()
+        if not frames:
+            return {}
+        result = {}
+        for i, name in enumerate(COLUMNS):
+            values = sorted(frame[i] for frame in frames)
+            p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+            result[name] = (sum(values) / len(values), p99)
+        return result
+
+    # --- Eksport ---
+    def export(self, path):
+        """Zapisuje całą historię klatek; format według rozszerzenia (.csv / .json)."""
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump([dict(zip(COLUMNS, frame)) for frame in self.frames], f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(self.frames)
+        return len(self.frames)
@@ -0,0 +1,140 @@
+"""Nagrania rozgrywki: seedy poziomów i wejście klatka po klatce - bez pygame.
+
+Symulacja jest deterministyczna przy danym seedzie i masce wejścia, więc
+nagranie to tylko lista odcinków (numer poziomu, seed, maski kolejnych
+kroków) i suma kontrolna stanu świata na końcu. Odtworzenie tych samych
+wejść musi dać tę samą sumę - plik jest jednocześnie testem determinizmu
+i powtarzalnym obciążeniem do pomiarów.
+
+Format pliku (little-endian):
+    nagłówek _HEADER: magia, flagi trybu, długość poziomu w ekranach,
+                      liczba odcinków, suma kontrolna
+    na odcinek _SEGMENT: numer poziomu, seed, liczba kroków, liczba serii,
+                      potem serie _RUN (ile kroków, maska) - wejście zmienia
+                      się rzadko, więc RLE zajmuje ułamek bajtu na krok
+"""
+
+import struct
+
+_HEADER = struct.Struct("<4sBBII")
+_SEGMENT = struct.Struct("<HIII")
+_RUN = struct.Struct("<HB")
+_MAGIC = b"AIR1"
+_MAX_RUN = 0xFFFF
+
+FLAG_STREAMING = 1
+FLAG_ENDLESS = 2
+FLAG_SMART_ENEMIES = 4
+
+
+class Segment:
+    __slots__ = ("level_num", "seed", "inputs")
+
+    def __init__(self, level_num, seed, inputs=None):
+        self.level_num = level_num
+        self.seed = seed
+        self.inputs = bytearray() if inputs is None else inputs
+
+
+class Recording:
+    """Nagranie sesji: kolejne załadowane poziomy i wejście każdego kroku."""
+
+    def __init__(
+        self,
+        level_length_screens=8,
+        streaming=False,
+        endless=False,
+        smart_enemies=False,
+    ):
+        self.level_length_screens = level_length_screens
+        self.streaming = streaming or endless
+        self.endless = endless
+        self.smart_enemies = smart_enemies
+        self.segments = []
+        self.checksum = None  # Suma stanu świata po ostatnim kroku
+
+    @property
+    def ticks(self):
+        return sum(len(segment.inputs) for segment in self.segments)
+
+    def start_level(self, level_num, seed):
+        self.segments.append(Segment(level_num, seed))
+
+    def record(self, controls):
+        self.segments[-1].inputs.append(controls)
+
+    def finish(self, checksum):
+        self.checksum = checksum
+
+    # --- Serializacja ---
+    def to_bytes(self):
+        flags = (
+            (FLAG_STREAMING if self.streaming else 0)
+            | (FLAG_ENDLESS if self.endless else 0)
+            | (FLAG_SMART_ENEMIES if self.smart_enemies else 0)
+        )
+        parts = [
+            _HEADER.pack(
+                _MAGIC,
+                flags,
+                self.level_length_screens,
+                len(self.segments),
+                self.checksum or 0,
+            )
+        ]
+        for segment in self.segments:
+            runs = _encode_runs(segment.inputs)
+            parts.append(
+                _SEGMENT.pack(
+                    segment.level_num, segment.seed, len(segment.inputs), len(runs)
+                )
+            )
+            parts.extend(_RUN.pack(count, controls) for count, controls in runs)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, flags, screens, segment_count, checksum = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("Nieprawidłowe dane nagrania")
+        recording = cls(
+            screens,
+            streaming=bool(flags & FLAG_STREAMING),
+            endless=bool(flags & FLAG_ENDLESS),
+            smart_enemies=bool(flags & FLAG_SMART_ENEMIES),
+        )
+        recording.checksum = checksum
+        offset = _HEADER.size
+        for _ in range(segment_count):
+            level_num, seed, ticks, run_count = _SEGMENT.unpack_from(data, offset)
+            offset += _SEGMENT.size
+            inputs = bytearray()
+            for count, controls in struct.iter_unpack(
+                "<HB", data[offset : offset + _RUN.size * run_count]
+            ):
+                inputs.extend(bytes([controls]) * count)
+            offset += _RUN.size * run_count
+            if len(inputs) != ticks:
+                raise ValueError("Uszkodzone nagranie: liczba kroków się nie zgadza")
+            recording.segments.append(Segment(level_num, seed, inputs))
+        return recording
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def _encode_runs(inputs):
+    """Zamienia maski kroków na listę serii (liczba, maska)."""
+    runs = []
+    for controls in inputs:
+        if runs and runs[-1][1] == controls and runs[-1][0] < _MAX_RUN:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, controls])
+    return runs
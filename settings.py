@@ -0,0 +1,104 @@
+"""Stałe gry i motywy poziomów - bez zależności od pygame."""
+
+# --- KONFIGURACJA (SETTINGS) ---
+SCREEN_WIDTH = 1920
+SCREEN_HEIGHT = 1080
+FPS = 60
+TILE_SIZE = 48
+
+# Fizyka i Ruch
+GRAVITY = 0.8
+WALK_SPEED = 7
+SPRINT_SPEED = 12  # Nowa prędkość sprintu
+JUMP_POWER = -22
+TERMINAL_VELOCITY = 15
+ENEMY_SPEED = 3
+ENEMY_WAKE_MARGIN = 4 * TILE_SIZE  # Wrogowie budzą się tyle pikseli przed kadrem
+ENEMY_SLEEP_DISTANCE = SCREEN_WIDTH  # ...i zasypiają tyle pikseli za nim
+ENEMY_JUMP_POWER = -19  # Skok sprytnych wrogów - wystarcza na cegły nad ziemią
+ENEMY_CHASE_DISTANCE = 8 * TILE_SIZE  # Sprytni wrogowie gonią gracza z tej odległości
+PLAYER_WIDTH = TILE_SIZE - 10
+PLAYER_HEIGHT = TILE_SIZE - 4
+ENEMY_SIZE = TILE_SIZE
+
+# Sterowanie - maska bitowa wejścia (klawiatura, skrypt lub losowa polityka)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_SPRINT = 8
+
+# Typy kafelków
+TYPE_GROUND = 0
+TYPE_BRICK = 1
+TYPE_HARD = 2
+TYPE_PIPE = 3
+TYPE_FLAG_POLE = 98  # Maszt
+TYPE_FLAG_TOP = 99  # Sama flaga
+TYPE_EMPTY = 255  # Puste pole w kompaktowej siatce poziomu
+
+FLAG_TYPES = (TYPE_FLAG_POLE, TYPE_FLAG_TOP)
+
+
+# --- DEFINICJE MOTYWÓW POZIOMÓW (COLORS) ---
+class ParallaxLayer:
+    """Warstwa tła: rodzaj rysunku, kolor, pas ekranu i prędkość względem kamery.
+
+    speed 0 stoi w miejscu, 1 przesuwa się razem z kafelkami.
+    """
+
+    def __init__(self, kind, color, top, height, speed):
+        self.kind = kind  # "clouds", "hills", "ridge" albo "stalactites"
+        self.color = color
+        self.top = top
+        self.height = height
+        self.speed = speed
+
+
+class LevelTheme:
+    def __init__(self, name, bg, ground, brick, pipe, enemy, layers=()):
+        self.name = name
+        self.bg_color = bg
+        self.ground_color = ground
+        self.brick_color = brick
+        self.pipe_color = pipe
+        self.enemy_color = enemy
+        self.layers = layers  # Od najdalszej do najbliższej
+
+
+# Motyw 1: Klasyczny Mario
+THEME_DAY = LevelTheme(
+    name="day",
+    bg=(107, 140, 255),  # Sky Blue
+    ground=(200, 76, 12),  # Brownish
+    brick=(180, 50, 0),
+    pipe=(0, 180, 0),
+    enemy=(165, 42, 42),
+    layers=(
+        ParallaxLayer("clouds", (235, 240, 255), 60, 300, 0.1),
+        ParallaxLayer("hills", (130, 190, 120), 520, 560, 0.25),
+        ParallaxLayer("hills", (70, 150, 70), 660, 420, 0.5),
+    ),
+)
+
+# Motyw 2: Jaskinia / Noc
+THEME_NIGHT = LevelTheme(
+    name="night",
+    bg=(20, 20, 40),  # Dark Navy
+    ground=(100, 100, 110),  # Grey Stone
+    brick=(80, 80, 120),  # Blueish Bricks
+    pipe=(0, 120, 0),  # Darker Pipe
+    enemy=(120, 30, 30),  # Dark Red
+    layers=(
+        ParallaxLayer("stalactites", (35, 35, 60), 0, 300, 0.15),
+        ParallaxLayer("ridge", (32, 32, 55), 560, 520, 0.3),
+        ParallaxLayer("stalactites", (50, 50, 80), 0, 200, 0.45),
+    ),
+)
+
+THEMES = {theme.name: theme for theme in (THEME_DAY, THEME_NIGHT)}
+
+# Kolory stałe
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+PLAYER_COLOR = (255, 0, 0)
+PIPE_HIGHLIGHT = (50, 220, 50)
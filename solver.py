@@ -0,0 +1,307 @@
+"""Analizator przechodniości poziomów - bez zależności od pygame.
+
+Poziom dzielony jest na powierzchnie (ciągłe rzędy kafelków, na których da
+się stać). Z każdej powierzchni symulowane są skoki i zejścia prawdziwą
+fizyką gracza (physics.py) - lot kończy się lądowaniem na innej powierzchni,
+śmiercią albo dotknięciem flagi. Przeszukiwanie idzie najpierw w prawo, więc
+przechodnie poziomy są potwierdzane po kilkudziesięciu lotach.
+
+Wrogowie są pomijani: zawsze da się ich przeskoczyć albo na nich wskoczyć.
+"""
+
+import argparse
+import heapq
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from level import SOLID, generate_level, LevelData
+from physics import move_body, player_velocity
+from settings import *
+
+MAX_FLIGHT_FRAMES = 150
+WALK_OFF_FRAMES = 8  # Po tylu klatkach bez oderwania od ziemi zejście się nie udało
+JUMP_CLEARANCE_ROWS = 7  # Wyżej niż tyle wierszy nad powierzchnią skok nie sięga
+
+
+def _macro(first, rest, switch=0, jump=False):
+    """Sterowanie na kolejne klatki lotu: `first` do klatki `switch`, potem `rest`."""
+    frames = [first] * switch + [rest] * (MAX_FLIGHT_FRAMES - switch)
+    if jump:
+        frames[0] |= INPUT_JUMP
+    return tuple(frames)
+
+
+_R = INPUT_RIGHT
+_L = INPUT_LEFT
+_S = INPUT_SPRINT
+
+
+# Ruchy z krawędzi na zewnątrz powierzchni (kolejność = kolejność prób).
+# Sterowanie w locie jest pełne, więc skok "w bok przez k klatek, potem stop"
+# pozwala wylądować na wąskim celu (szczyt rury) zamiast go przelecieć.
+def _edge_macros(side):
+    run = side | _S
+    macros = [
+        _macro(run, run, jump=True),
+        _macro(side, side, jump=True),
+        _macro(0, run, switch=8, jump=True),
+        _macro(0, run, switch=16, jump=True),
+    ]
+    macros.extend(_macro(run, 0, switch=k, jump=True) for k in (4, 8, 12, 16, 20, 24))
+    macros.extend(_macro(side, 0, switch=k, jump=True) for k in (6, 12, 18, 24))
+    macros.extend((_macro(run, run), _macro(side, side), _macro(run, 0, switch=4)))
+    return tuple(macros)
+
+
+_EDGE_MACROS = {1: _edge_macros(_R), -1: _edge_macros(_L)}
+
+# Skoki ze środka powierzchni - tylko gdy nad nią coś jest (cegły, rury)
+_INNER_MACROS = (
+    _macro(0, 0, jump=True),
+    _macro(_R, _R, jump=True),
+    _macro(_L, _L, jump=True),
+    _macro(_R | _S, _R | _S, jump=True),
+    _macro(_L | _S, _L | _S, jump=True),
+)
+
+
+class SolveResult:
+    __slots__ = ("solvable", "failing_col", "flights")
+
+    def __init__(self, solvable, failing_col, flights):
+        self.solvable = solvable
+        self.failing_col = failing_col  # Pierwsza kolumna, której nie da się minąć
+        self.flights = flights
+
+    def __repr__(self):
+        if self.solvable:
+            return f"SolveResult(solvable, flights={self.flights})"
+        return (
+            f"SolveResult(unsolvable at col {self.failing_col}, flights={self.flights})"
+        )
+
+
+class _Surfaces:
+    """Powierzchnie poziomu: ciągłe kafelki stałe z wolnym polem nad sobą."""
+
+    def __init__(self, level):
+        self.level = level
+        self.segments = []  # (row, start_col, end_col)
+        self.by_cell = {}
+        self.flag = None
+
+        tile_at = level.tile_at
+        for row in range(1, level.height):
+            start = None
+            for col in range(level.origin, level.width + 1):
+                standing = (
+                    col < level.width
+                    and SOLID[tile_at(col, row)]
+                    and not SOLID[tile_at(col, row - 1)]
+                )
+                if standing and start is None:
+                    start = col
+                elif not standing and start is not None:
+                    self._add(row, start, col - 1)
+                    start = None
+
+        flag_cells = [
+            (col, row)
+            for col, row, tile_type in level.column_cells(level.origin, level.width)
+            if tile_type in FLAG_TYPES
+        ]
+        if flag_cells:
+            cols = [col for col, _ in flag_cells]
+            rows = [row for _, row in flag_cells]
+            self.flag = (min(cols), max(cols), min(rows), max(rows))
+
+    def _add(self, row, start, end):
+        index = len(self.segments)
+        self.segments.append((row, start, end))
+        for col in range(start, end + 1):
+            self.by_cell[(col, row)] = index
+
+    def is_goal(self, index):
+        """Czy idąc po powierzchni gracz wchodzi w maszt flagi."""
+        row, start, end = self.segments[index]
+        tile_at = self.level.tile_at
+        return any(tile_at(col, row - 1) in FLAG_TYPES for col in range(start, end + 1))
+
+    def segment_under(self, x, y):
+        """Powierzchnia, na której stoi gracz o lewym górnym rogu (x, y)."""
+        row = (y + PLAYER_HEIGHT) // TILE_SIZE
+        for col in range(x // TILE_SIZE, (x + PLAYER_WIDTH - 1) // TILE_SIZE + 1):
+            index = self.by_cell.get((col, row))
+            if index is not None:
+                return index
+        return None
+
+    def touches_flag(self, x, y):
+        if self.flag is None:
+            return False
+        col_min, col_max, row_min, row_max = self.flag
+        return (
+            x // TILE_SIZE <= col_max
+            and (x + PLAYER_WIDTH - 1) // TILE_SIZE >= col_min
+            and y // TILE_SIZE <= row_max
+            and (y + PLAYER_HEIGHT - 1) // TILE_SIZE >= row_min
+        )
+
+    def launches(self, index):
+        """Lista (x, makro) do wypróbowania z danej powierzchni."""
+        row, start, end = self.segments[index]
+        tile_at = self.level.tile_at
+        y = row * TILE_SIZE - PLAYER_HEIGHT
+
+        # Krawędzie: przy ścianie stajemy tuż przy niej, nad przepaścią - na ostatnim pikselu
+        if SOLID[tile_at(end + 1, row - 1)]:
+            right_x = (end + 1) * TILE_SIZE - PLAYER_WIDTH
+        else:
+            right_x = (end + 1) * TILE_SIZE - 1
+        if SOLID[tile_at(start - 1, row - 1)]:
+            left_x = start * TILE_SIZE
+        else:
+            left_x = start * TILE_SIZE - PLAYER_WIDTH + 1
+
+        launches = [(right_x, y, macro) for macro in _EDGE_MACROS[1]]
+        launches.extend((left_x, y, macro) for macro in _EDGE_MACROS[-1])
+
+        overhead = any(
+            SOLID[tile_at(col, r)]
+            for col in range(start, end + 1)
+            for r in range(max(0, row - JUMP_CLEARANCE_ROWS), row - 1)
+        )
+        if overhead:
+            for col in range(start, end + 1):
+                x = col * TILE_SIZE + (TILE_SIZE - PLAYER_WIDTH) // 2
+                launches.extend((x, y, macro) for macro in _INNER_MACROS)
+        return launches
+
+
+def _fly(level, surfaces, x, y, macro):
+    """Symuluje jeden ruch. Zwraca "flag", (x, y) lądowania albo None."""
+    vel_y = 0
+    on_ground = True
+    airborne = False
+    death_y = SCREEN_HEIGHT + TILE_SIZE
+    for frame, controls in enumerate(macro):
+        vel_x, vel_y = player_velocity(controls, vel_y, on_ground)
+        x, y, vel_y, on_ground = move_body(
+            level, x, y, PLAYER_WIDTH, PLAYER_HEIGHT, vel_x, vel_y
+        )
+        if surfaces.touches_flag(x, y):
+            return "flag"
+        if y > death_y:
+            return None
+        if on_ground:
+            if airborne:
+                return x, y
+        else:
+            airborne = True
+        if not airborne and frame >= WALK_OFF_FRAMES:
+            return None
+    return None
+
+
+def check_level(level):
+    """Sprawdza, czy od punktu startu da się dojść do flagi."""
+    surfaces = _Surfaces(level)
+
+    # Start: gracz spada z punktu spawnu na pierwszą powierzchnię
+    landing = _fly(level, surfaces, *level.spawn, _macro(0, 0))
+    if landing == "flag":
+        return SolveResult(True, None, 0)
+    if landing is None or surfaces.segment_under(*landing) is None:
+        return SolveResult(False, level.spawn[0] // TILE_SIZE, 0)
+
+    start = surfaces.segment_under(*landing)
+    if surfaces.is_goal(start):
+        return SolveResult(True, None, 0)
+    visited = {start}
+    furthest = surfaces.segments[start][2]
+    flights = 0
+    pending = {start: surfaces.launches(start)}
+    # Najpierw powierzchnie najbardziej na prawo, w ramach nich kolejne ruchy
+    frontier = [(-furthest, 0, start)]
+
+    while frontier:
+        _, attempt, index = heapq.heappop(frontier)
+        launches = pending[index]
+        if attempt + 1 < len(launches):
+            heapq.heappush(frontier, (-surfaces.segments[index][2], attempt + 1, index))
+
+        x, y, macro = launches[attempt]
+        flights += 1
+        result = _fly(level, surfaces, x, y, macro)
+        if result == "flag":
+            return SolveResult(True, None, flights)
+        if result is None:
+            continue
+
+        target = surfaces.segment_under(*result)
+        if target is None or target in visited:
+            continue
+        visited.add(target)
+        if surfaces.is_goal(target):
+            return SolveResult(True, None, flights)
+        furthest = max(furthest, surfaces.segments[target][2])
+        pending[target] = surfaces.launches(target)
+        heapq.heappush(frontier, (-surfaces.segments[target][2], 0, target))
+
+    return SolveResult(False, furthest + 1, flights)
+
+
+def check_seed(seed, difficulty=1, level_length_screens=8):
+    """Generuje poziom z seeda i sprawdza go; wynik (seed, solvable, failing_col)."""
+    level = LevelData.from_bytes(generate_level(seed, difficulty, level_length_screens))
+    result = check_level(level)
+    return seed, result.solvable, result.failing_col
+
+
+def _check_chunk(args):
+    seeds, difficulty, level_length_screens = args
+    return [check_seed(seed, difficulty, level_length_screens) for seed in seeds]
+
+
+def check_batch(seeds, difficulty=1, level_length_screens=8, workers=None):
+    """Sprawdza wiele seedów równolegle; wyniki w kolejności seedów."""
+    seeds = list(seeds)
+    workers = workers or os.cpu_count() or 1
+    per_chunk = max(1, len(seeds) // (workers * 4))
+    jobs = [
+        (seeds[i : i + per_chunk], difficulty, level_length_screens)
+        for i in range(0, len(seeds), per_chunk)
+    ]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(_check_chunk, jobs):
+            results.extend(chunk)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sprawdzanie przechodniości poziomów")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--difficulty", type=int, default=1)
+    parser.add_argument("--screens", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = check_batch(
+        range(args.first_seed, args.first_seed + args.count),
+        args.difficulty,
+        args.screens,
+        args.workers,
+    )
+    elapsed = time.perf_counter() - start
+
+    failed = [(seed, col) for seed, solvable, col in results if not solvable]
+    for seed, col in failed:
+        print(f"seed {seed}: unsolvable at column {col}")
+    print(
+        f"{len(results) - len(failed)}/{len(results)} solvable, "
+        f"{elapsed:.2f}s ({len(results) / elapsed:.0f} levels/s)"
+    )